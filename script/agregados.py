@@ -0,0 +1,75 @@
+import pandas as pd
+
+# Materiais apontados na aba de produção
+MATERIAIS = ('Cobre', 'Alumínio')
+
+
+def _quantidades_em_float64(dados):
+    """As quantidades ficam em float32 no frame limpo; as somas são feitas em float64."""
+    colunas = [f'{prefixo} {material}{sufixo}' for material in MATERIAIS
+               for prefixo, sufixo in (('Produção', ' Realizado'), ('Meta/Dia', ''))]
+    return dados.astype({coluna: 'float64' for coluna in colunas})
+
+
+def montar_cubo_mensal(dados):
+    """Agrega o apontamento por (Ano, Mês, Material) com um único groupby.
+
+    Para cada combinação guarda a produção realizada, a soma das metas, o número
+    de dias apontados e a meta do primeiro dia (base da expectativa do mês).
+    Os meses ficam na ordem em que aparecem na pasta de trabalho.
+    """
+    especificacao = {'Dias': ('Data', 'size')}
+    for material in MATERIAIS:
+        especificacao[f'Produção {material}'] = (f'Produção {material} Realizado', 'sum')
+        especificacao[f'Meta {material}'] = (f'Meta/Dia {material}', 'sum')
+        especificacao[f'Meta Primeiro Dia {material}'] = (f'Meta/Dia {material}', 'first')
+    agregado = _quantidades_em_float64(dados).groupby(['Ano', 'Mês'], sort=False, observed=True).agg(**especificacao)
+
+    por_material = {
+        material: pd.DataFrame({
+            'Produção': agregado[f'Produção {material}'],
+            'Meta': agregado[f'Meta {material}'],
+            'Dias': agregado['Dias'],
+            'Meta Primeiro Dia': agregado[f'Meta Primeiro Dia {material}'],
+        })
+        for material in MATERIAIS
+    }
+    cubo = pd.concat(por_material, names=['Material'])
+    return cubo.reorder_levels(['Ano', 'Mês', 'Material'])
+
+
+def indices_por_mes(dados):
+    """Mapeia (Ano, Mês) para as posições das linhas diárias daquele mês."""
+    return dados.groupby(['Ano', 'Mês'], sort=False, observed=True).indices
+
+
+def fatia_do_cubo(cubo, ano, material):
+    """Fatia do cubo com os meses de um ano para um material, na ordem original."""
+    return cubo.xs((ano, material), level=('Ano', 'Material'))
+
+
+def montar_resumo_anual(dados):
+    """Totais de produção e de meta por (Material, Ano), com um único groupby.
+
+    Os anos ficam na ordem em que aparecem na pasta; selecionar qualquer
+    combinação de anos vira uma fatia do índice, sem reler as linhas diárias.
+    """
+    especificacao = {}
+    for material in MATERIAIS:
+        especificacao[f'Produção {material}'] = (f'Produção {material} Realizado', 'sum')
+        especificacao[f'Meta {material}'] = (f'Meta/Dia {material}', 'sum')
+    agregado = _quantidades_em_float64(dados).groupby('Ano', sort=False).agg(**especificacao)
+
+    por_material = {
+        material: pd.DataFrame({
+            'Produção': agregado[f'Produção {material}'],
+            'Meta': agregado[f'Meta {material}'],
+        })
+        for material in MATERIAIS
+    }
+    return pd.concat(por_material, names=['Material'])
+
+
+def fatia_do_resumo_anual(resumo_anual, anos, material):
+    """Fatia do resumo anual com os anos selecionados, na ordem da seleção."""
+    return resumo_anual.loc[material].loc[list(anos)]
@@ -0,0 +1,266 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from classificacao import extrair_cores
+from estoque import carregar_serie_estoque
+from ingestao import BASE_DIR, ESQUEMA_POINTING, carregar_abas_pointing, impressao_digital, ler_planilha
+
+# Banco operacional embutido, compartilhado por todas as sessões do dashboard
+BANCO_PATH = os.path.join(BASE_DIR, '.cache', 'operacional.sqlite3')
+# Muda sempre que o esquema das tabelas mudar, para forçar a reimportação
+VERSAO_ESQUEMA_BANCO = 1
+
+ESQUEMA_BANCO = """
+CREATE TABLE IF NOT EXISTS fontes (
+    tabela TEXT PRIMARY KEY,
+    arquivo TEXT NOT NULL,
+    versao TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pointing (
+    linha INTEGER PRIMARY KEY,
+    ano INTEGER NOT NULL,
+    mes TEXT NOT NULL,
+    dia INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    producao_cobre REAL,
+    meta_cobre REAL,
+    producao_aluminio REAL,
+    meta_aluminio REAL
+);
+CREATE INDEX IF NOT EXISTS pointing_ano_mes ON pointing (ano, mes, linha);
+CREATE TABLE IF NOT EXISTS estoque (
+    data TEXT NOT NULL,
+    produto TEXT NOT NULL,
+    kg REAL,
+    PRIMARY KEY (data, produto)
+);
+CREATE INDEX IF NOT EXISTS estoque_produto ON estoque (produto, data);
+CREATE TABLE IF NOT EXISTS compostos (
+    ordem INTEGER PRIMARY KEY,
+    composto TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS demanda (
+    composto TEXT NOT NULL,
+    cor TEXT NOT NULL,
+    kg REAL NOT NULL,
+    PRIMARY KEY (composto, cor)
+);
+"""
+
+# Colunas de produção e meta de cada material (nomes fixos, nunca vindos do usuário)
+COLUNAS_MATERIAL = {
+    'Cobre': ('producao_cobre', 'meta_cobre'),
+    'Alumínio': ('producao_aluminio', 'meta_aluminio'),
+}
+
+# Uma conexão por thread: o sqlite3 não compartilha conexões entre threads
+_conexoes = threading.local()
+
+
+def conectar(caminho=None):
+    """Retorna a conexão da thread atual com o banco, criando o esquema se preciso."""
+    caminho = caminho or BANCO_PATH
+    conexoes = getattr(_conexoes, 'abertas', None)
+    if conexoes is None:
+        conexoes = _conexoes.abertas = {}
+    if caminho not in conexoes:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None)
+        # WAL: leitores não bloqueiam durante uma importação
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=NORMAL')
+        conexao.executescript(ESQUEMA_BANCO)
+        conexoes[caminho] = conexao
+    return conexoes[caminho]
+
+
+def _versao_fonte(arquivo):
+    """Versão gravada em `fontes`: impressão digital do arquivo + versão do esquema."""
+    return json.dumps([VERSAO_ESQUEMA_BANCO, *impressao_digital(arquivo)])
+
+
+def _importar(tabela, arquivo, preencher):
+    """Reimporta uma tabela a partir do arquivo se a versão dele mudou.
+
+    `preencher(conexao)` grava as linhas novas; tudo roda numa única transação,
+    então leitores continuam vendo a versão anterior até o COMMIT. Retorna True
+    se a tabela foi reimportada.
+    """
+    arquivo = os.path.abspath(arquivo)
+    versao = _versao_fonte(arquivo)
+    conexao = conectar()
+    registro = conexao.execute('SELECT versao FROM fontes WHERE tabela = ?', (tabela,)).fetchone()
+    if registro is not None and registro[0] == versao:
+        return False
+
+    conexao.execute('BEGIN IMMEDIATE')
+    try:
+        # Outra sessão pode ter importado enquanto esperávamos a trava
+        registro = conexao.execute('SELECT versao FROM fontes WHERE tabela = ?', (tabela,)).fetchone()
+        if registro is not None and registro[0] == versao:
+            conexao.execute('ROLLBACK')
+            return False
+        preencher(conexao)
+        conexao.execute('INSERT OR REPLACE INTO fontes (tabela, arquivo, versao) VALUES (?, ?, ?)',
+                        (tabela, arquivo, versao))
+        conexao.execute('COMMIT')
+    except BaseException:
+        conexao.execute('ROLLBACK')
+        raise
+    return True
+
+
+def importar_pointing(arquivo, ao_falhar=None):
+    """Importa as abas mensais do apontamento para a tabela `pointing`."""
+    def preencher(conexao):
+        dados = carregar_abas_pointing(arquivo, ao_falhar=ao_falhar, incremental=True)
+        conexao.execute('DELETE FROM pointing')
+        if dados is None:
+            return
+        linhas = pd.DataFrame({
+            'ano': dados['Ano'].astype('int64'),
+            'mes': dados['Mês'].astype('str'),
+            'dia': dados[''].astype('int64'),
+            'data': dados['Data'].dt.strftime('%Y-%m-%d'),
+            'producao_cobre': dados['Produção Cobre Realizado'].astype('float64'),
+            'meta_cobre': dados['Meta/Dia Cobre'].astype('float64'),
+            'producao_aluminio': dados['Produção Alumínio Realizado'].astype('float64'),
+            'meta_aluminio': dados['Meta/Dia Alumínio'].astype('float64'),
+        })
+        conexao.executemany(
+            'INSERT INTO pointing (ano, mes, dia, data, producao_cobre, meta_cobre, producao_aluminio, meta_aluminio)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            linhas.itertuples(index=False, name=None),
+        )
+    return _importar('pointing', arquivo, preencher)
+
+
+def importar_estoque(caminho):
+    """Importa a série histórica do almoxarifado para a tabela `estoque`."""
+    def preencher(conexao):
+        serie = carregar_serie_estoque(caminho).reset_index()
+        conexao.execute('DELETE FROM estoque')
+        conexao.executemany(
+            'INSERT INTO estoque (data, produto, kg) VALUES (?, ?, ?)',
+            zip(serie['Data'].dt.strftime('%Y-%m-%d'), serie['Produto'], serie['kg']),
+        )
+    return _importar('estoque', caminho, preencher)
+
+
+def importar_demanda(caminho):
+    """Importa o Programa de Extrusão como demanda por (composto, cor)."""
+    def preencher(conexao):
+        dados = ler_planilha(caminho, "ProgramaExtrusão", 4)
+        colunas_compostos = dados.columns[18:]
+        demanda_por_cor = dados[colunas_compostos].groupby(extrair_cores(dados["DESCRIÇÃO"])).sum()
+        conexao.execute('DELETE FROM compostos')
+        conexao.execute('DELETE FROM demanda')
+        conexao.executemany('INSERT INTO compostos (ordem, composto) VALUES (?, ?)',
+                            enumerate(map(str, colunas_compostos)))
+        conexao.executemany(
+            'INSERT INTO demanda (composto, cor, kg) VALUES (?, ?, ?)',
+            ((str(composto), cor, float(kg))
+             for composto in colunas_compostos
+             for cor, kg in demanda_por_cor[composto].items()),
+        )
+    return _importar('demanda', caminho, preencher)
+
+
+def versoes_fontes():
+    """Versão importada de cada tabela; muda a cada reimportação e serve de chave de cache."""
+    return tuple(conectar().execute('SELECT tabela, versao FROM fontes ORDER BY tabela').fetchall())
+
+
+def _consultar(sql, parametros=()):
+    """Executa uma consulta no banco e devolve um DataFrame."""
+    return pd.read_sql_query(sql, conectar(), params=parametros)
+
+
+def anos_pointing():
+    """Anos apontados, na ordem em que aparecem na pasta de trabalho."""
+    return _consultar('SELECT ano FROM pointing GROUP BY ano ORDER BY MIN(linha)')['ano'].tolist()
+
+
+def resumo_dos_anos(anos, material):
+    """Produção e meta totais de um material nos anos selecionados, na ordem da seleção."""
+    producao, meta = COLUNAS_MATERIAL[material]
+    marcadores = ', '.join('?' * len(anos))
+    resumo = _consultar(
+        f'SELECT ano AS "Ano", TOTAL({producao}) AS "Produção", TOTAL({meta}) AS "Meta"'
+        f' FROM pointing WHERE ano IN ({marcadores}) GROUP BY ano',
+        [int(ano) for ano in anos],
+    )
+    return resumo.set_index('Ano').reindex([int(ano) for ano in anos])
+
+
+def resumo_do_ano(ano, material):
+    """Resumo mensal de um material num ano: produção, meta, dias e meta do primeiro dia."""
+    producao, meta = COLUNAS_MATERIAL[material]
+    resumo = _consultar(
+        f'SELECT mes AS "Mês", TOTAL({producao}) AS "Produção", TOTAL({meta}) AS "Meta",'
+        f' COUNT(*) AS "Dias",'
+        f' (SELECT {meta} FROM pointing AS primeiro WHERE primeiro.ano = pointing.ano'
+        f'  AND primeiro.mes = pointing.mes ORDER BY linha LIMIT 1) AS "Meta Primeiro Dia"'
+        f' FROM pointing WHERE ano = ? GROUP BY mes ORDER BY MIN(linha)',
+        (int(ano),),
+    )
+    return resumo.set_index('Mês')
+
+
+def producao_diaria(ano, mes, material):
+    """Linhas diárias de um mês para um material, indexadas pelo dia do mês."""
+    producao, meta = COLUNAS_MATERIAL[material]
+    coluna_producao = f'Produção {material} Realizado'
+    coluna_meta = f'Meta/Dia {material}'
+    dados = _consultar(
+        f'SELECT dia AS "", data AS "Data", {producao} AS "{coluna_producao}", {meta} AS "{coluna_meta}"'
+        f' FROM pointing WHERE ano = ? AND mes = ? ORDER BY linha',
+        (int(ano), mes),
+    )
+    dados['Data'] = pd.to_datetime(dados['Data'], format='%Y-%m-%d')
+    dados = dados.astype({coluna: ESQUEMA_POINTING[coluna] for coluna in ('', coluna_producao, coluna_meta)})
+    return dados.set_index('')
+
+
+def serie_diaria(anos, material):
+    """Produção e meta diárias de um material nos anos informados, em ordem de data."""
+    producao, meta = COLUNAS_MATERIAL[material]
+    coluna_producao = f'Produção {material} Realizado'
+    coluna_meta = f'Meta/Dia {material}'
+    marcadores = ', '.join('?' * len(anos))
+    dados = _consultar(
+        f'SELECT data AS "Data", {producao} AS "{coluna_producao}", {meta} AS "{coluna_meta}"'
+        f' FROM pointing WHERE ano IN ({marcadores}) ORDER BY data, linha',
+        [int(ano) for ano in anos],
+    )
+    dados['Data'] = pd.to_datetime(dados['Data'], format='%Y-%m-%d')
+    return dados.astype({coluna: ESQUEMA_POINTING[coluna] for coluna in (coluna_producao, coluna_meta)})
+
+
+def comparativo_demanda_estoque():
+    """Demanda total de cada composto contra o estoque da última data apontada.
+
+    As quantidades saem sempre em float: sem estoque apontado o COALESCE devolveria inteiros.
+    """
+    return _consultar(
+        'SELECT c.composto AS "Composto", TOTAL(d.kg) AS "Demanda (kg)",'
+        ' COALESCE((SELECT e.kg FROM estoque AS e WHERE e.produto = c.composto'
+        '           AND e.data = (SELECT MAX(data) FROM estoque)), 0) AS "Estoque Atual (kg)"'
+        ' FROM compostos AS c LEFT JOIN demanda AS d ON d.composto = c.composto'
+        ' GROUP BY c.ordem ORDER BY c.ordem'
+    ).astype({"Demanda (kg)": "float64", "Estoque Atual (kg)": "float64"}).assign(
+        **{"Saldo (kg)": lambda df: df["Demanda (kg)"] - df["Estoque Atual (kg)"]})
+
+
+def tabela_demanda_por_cor():
+    """Demanda por cor com uma coluna por composto (uma linha por cor)."""
+    demanda = _consultar('SELECT cor AS "Cor", composto, kg FROM demanda')
+    compostos = _consultar('SELECT composto FROM compostos ORDER BY ordem')['composto']
+    tabela = demanda.pivot(index='Cor', columns='composto', values='kg').reindex(columns=compostos)
+    tabela.columns.name = None
+    return tabela.reset_index()
+
@@ -1,199 +1,84 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import os
-import locale 
+import time
+
+# Início da execução, para medir a primeira renderização da sessão
+inicio_execucao = time.perf_counter()
 
-# Configurações gerais
-BASE_DIR = os.getcwd()
-DADOS_PRODUCAO_PATH = os.path.join(BASE_DIR, ".database", "DATABASE.xlsx")  # Programa de Extrusão
-DADOS_ESTOQUE_PATH = os.path.join(BASE_DIR, ".database", "Novembro-2024 - Copia.xlsx")  # Almoxarifado
+import streamlit as st
+from banco import comparativo_demanda_estoque, tabela_demanda_por_cor, versoes_fontes
+from registro import sincronizar
+from inicializacao import aquecer, medir_primeira_renderizacao
+from formatacao import cores_saldo, destacar_saldo
+from detalhes import exibir_detalhes_compostos
+from graficos import figura_em_cache
+from memoria import em_cache
 
 st.set_page_config(page_title="Dashboard Operacional", layout="wide")
 
-# Definir o formato de números como pt-BR
-locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-locale.atof = lambda x: float(x.replace('.', '').replace(',', '.'))  
-# (talvez seja inútilKKK, mas deixa ai, não vamos mexer no que está quieto) Ignorar separadores de milhar e considerar apenas 2 casas decimais
+# Aquecimento dos dados da página padrão numa thread, uma única vez por servidor
+@st.cache_resource
+def iniciar_aquecimento():
+    return aquecer(sincronizar=('programa', 'estoque'))
+
+iniciar_aquecimento()
 
-def formatar_valores(valor):
-    """ Formatar valores numéricos no formato 10.000,00 """
-    return locale.format_string('%.2f', valor)
 # Funções utilitárias
-def carregar_dados(caminho, aba, header):
-    """Carrega dados de uma planilha Excel."""
+def sincronizar_banco():
+    """Importa o programa de extrusão e o estoque para o banco operacional, se tiverem mudado."""
     try:
-        dados = pd.read_excel(caminho, sheet_name=aba, header=header)
-        return dados
+        # Planilhas já publicadas pelo ingestor em segundo plano não são relidas aqui
+        sincronizar('programa')
+        sincronizar('estoque')
+        return True
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
-        return None
-
-def carregar_dados_estoque(caminho):
-    """Carrega dados do almoxarifado, soma os estoques por grupo e retorna o saldo."""
-    try:
-        # Carregar a planilha completa
-        dados = pd.read_excel(caminho, sheet_name="Folha1", header=1)
-
-        # Identificar as colunas de datas
-        colunas_datas = dados.columns[6:]  # As datas começam na coluna 6
-        ultima_coluna_valida = next(
-            (col for col in reversed(colunas_datas) if dados[col].notnull().any()), None
-        )
+        return False
 
-        if not ultima_coluna_valida:
-            raise ValueError("Nenhuma coluna com valores atualizados foi encontrada.")
-
-        # Extrair as informações relevantes
-        dados_estoque = dados[["Produto", ultima_coluna_valida]].copy()
-        dados_estoque = dados_estoque.rename(columns={ultima_coluna_valida: "Estoque (kg)"})
-
-        # Remover linhas sem produto ou estoque válido
-        dados_estoque = dados_estoque.dropna(subset=["Produto", "Estoque (kg)"])
-
-        # Agrupar por grupo de materiais (ajustar conforme o formato dos dados)
-        dados_estoque = dados_estoque.groupby("Produto", as_index=False).sum()
-
-        return dados_estoque
-    except Exception as e:
-        st.error(f"Erro ao carregar os dados de estoque: {e}")
-        return None
-
-def extrair_cor(descricao):
-    """Extrai a cor de um material a partir da descrição."""
-    if pd.isna(descricao):
-        return "Indefinido"
-    if '-' in descricao:
-        return descricao.split('-')[-1].strip()
-    return "Indefinido"
-
-def processar_demanda(dados_producao):
-    """Processa demandas e organiza por composto e cor."""
-    # Identificar colunas descritivas e compostos
-    colunas_descritivas = dados_producao.columns[:18]
-    colunas_compostos = dados_producao.columns[18:]
-
-    # Adicionar coluna de cor
-    dados_producao["Cor"] = dados_producao["DESCRIÇÃO"].apply(extrair_cor)
-
-    # Soma total por composto
-    demanda_total = dados_producao[colunas_compostos].sum()
-
-    # Soma por cor
-    demanda_por_cor = (
-        dados_producao.groupby("Cor")[colunas_compostos].sum().reset_index()
-    )
-    return demanda_total, demanda_por_cor
-
-def comparar_demanda_estoque(demanda_total, dados_estoque):
-    """Compara a demanda total de compostos com o estoque disponível."""
-    # Reindexar estoque para alinhar com os compostos da demanda
-    estoque_atual = dados_estoque.set_index("Produto")["Estoque (kg)"]
-
-    # Garantir alinhamento entre demanda e estoque
-    estoque_atual = estoque_atual.reindex(demanda_total.index, fill_value=0)
-
-    # Calcular o saldo
-    saldo = demanda_total - estoque_atual
-
-    # Criar dataframe de resultado
-    resultado = pd.DataFrame({
-        "Composto": demanda_total.index,
-        "Demanda (kg)": demanda_total.values,
-        "Estoque Atual (kg)": estoque_atual.values,
-        "Saldo (kg)": saldo.values,
-    })
-    return resultado
-
-def exibir_detalhes_composto(resultado, demanda_por_cor):
-    """Organiza os expansores e as informações internas em colunas, ordenando por valor."""
-    colunas_por_linha_expansores = 3  # Número de expansores por linha
-    colunas_por_linha_info = 2  # Número de colunas dentro de cada expansor
-
-    num_compostos = len(resultado)
-
-    # Criar linhas de expansores
-    linhas_expansores = [
-        resultado.iloc[i : i + colunas_por_linha_expansores]
-        for i in range(0, num_compostos, colunas_por_linha_expansores)
-    ]
-
-    # Renderizar expansores organizados em colunas
-    for linha in linhas_expansores:
-        cols = st.columns(colunas_por_linha_expansores)
-        for col, composto_data in zip(cols, linha.itertuples()):
-            with col:
-                with st.expander(f"Detalhes do Composto: {composto_data.Composto}"):
-                    # Exibir informações detalhadas por cor em grade
-                    if composto_data.Composto in demanda_por_cor.columns:
-                        dados_detalhados = demanda_por_cor[["Cor", composto_data.Composto]]
-                        dados_detalhados = dados_detalhados.rename(
-                            columns={composto_data.Composto: "Demanda (kg)"}
-                        )
-
-                        # Ordenar os dados por valor de demanda (decrescente)
-                        dados_detalhados = dados_detalhados.sort_values(
-                            by="Demanda (kg)", ascending=False
-                        )
-
-                        # Organizar os detalhes em colunas
-                        num_infos = len(dados_detalhados)
-                        linhas_info = [
-                            dados_detalhados.iloc[i : i + colunas_por_linha_info]
-                            for i in range(0, num_infos, colunas_por_linha_info)
-                        ]
-
-                        for linha_info in linhas_info:
-                            cols_info = st.columns(colunas_por_linha_info)
-                            for col_info, info in zip(cols_info, linha_info.itertuples()):
-                                with col_info:
-                                    st.metric(
-                                        label=f"Cor: {info.Cor}",
-                                        value=f"{info._2} kg",
-                                    )
+# Comparativo e destaque do saldo calculados uma única vez por versão do banco
+# e compartilhados entre as sessões sem cópia
+def carregar_comparativo(versoes=None):
+    def montar():
+        resultado = comparativo_demanda_estoque()
+        return resultado, cores_saldo(resultado["Saldo (kg)"])
+    return em_cache('comparativo', versoes, montar)
 
 # Página principal
 def pagina_demanda_polimeros():
     st.title("Demanda de Polímeros")
     st.write("### Comparação entre demanda de produção e estoque de polímeros")
 
-    # Carregar dados
-    dados_producao = carregar_dados(DADOS_PRODUCAO_PATH, "ProgramaExtrusão", 4)
-    dados_estoque = carregar_dados_estoque(DADOS_ESTOQUE_PATH)
-
-    if dados_producao is not None and dados_estoque is not None:
-        
-        # Processar demanda
-        demanda_total, demanda_por_cor = processar_demanda(dados_producao)
+    # Carregar dados: as planilhas passam pelo banco e as agregações rodam em SQL
+    if sincronizar_banco():
 
-        # Comparar demanda e estoque
-        resultado_comparacao = comparar_demanda_estoque(demanda_total, dados_estoque)
+        # Demanda por composto contra o estoque e detalhamento por cor
+        resultado_comparacao, cores_comparacao = carregar_comparativo(versoes_fontes())
+        demanda_por_cor = tabela_demanda_por_cor()
 
         # Exibir resultados gerais
         st.subheader("Resumo Geral")
         st.dataframe(
-            resultado_comparacao.style.applymap(
-                lambda x: "background-color: red" if x < 0 else "background-color: green",
-                subset=["Saldo (kg)"]
-            )
+            destacar_saldo(resultado_comparacao, cores=cores_comparacao)
         )
 
         # Gráfico de distribuição
         st.subheader("Distribuição de Demanda por Composto")
-        fig = px.bar(
+        import plotly.express as px  # importado só quando há gráfico
+        # Figura reaproveitada enquanto os dados não mudarem
+        fig = figura_em_cache(versoes_fontes(), 'base:comparativo', (), lambda: px.bar(
             resultado_comparacao,
             x="Composto",
             y=["Demanda (kg)", "Estoque Atual (kg)"],
             barmode="group",
             title="Comparativo de Demanda e Estoque"
-        )
+        ))
         st.plotly_chart(fig)
 
         # Exibir detalhes por composto
-        exibir_detalhes_composto(resultado_comparacao, demanda_por_cor)
+        exibir_detalhes_compostos(resultado_comparacao["Composto"], demanda_por_cor, chave="detalhes_composto")
     else:
         st.error("Erro ao carregar os dados das planilhas.")
 
 # Configuração e exibição
 
-pagina_demanda_polimeros()
\ No newline at end of file
+pagina_demanda_polimeros()
+
+medir_primeira_renderizacao(st.session_state, inicio_execucao)
@@ -0,0 +1,83 @@
+import re
+
+import pandas as pd
+
+# Cor usada quando a descrição não traz o sufixo "-COR"
+COR_INDEFINIDA = "Indefinido"
+
+
+def extrair_cores(descricoes):
+    """Extrai a cor (texto após o último '-') de uma série de descrições.
+
+    A extração roda com operações .str apenas sobre as descrições distintas e o
+    resultado é espalhado de volta com um map, então escala com o número de
+    descrições diferentes e não com o de linhas do programa.
+    """
+    distintas = pd.Series(pd.unique(descricoes.dropna()), dtype=object)
+    textos = distintas.where(distintas.map(type) == str)
+    cores = textos.str.rsplit('-', n=1).str[-1].str.strip()
+    cores = cores.where(textos.str.contains('-', regex=False, na=False), COR_INDEFINIDA)
+    tabela = pd.Series(cores.to_numpy(), index=distintas.to_numpy())
+    return descricoes.map(tabela).fillna(COR_INDEFINIDA)
+
+
+def achatar_aliases(dicionario):
+    """Achata um dicionário cujas chaves podem ser tuplas de aliases em pares (alias, código)."""
+    pares = []
+    for chave, codigo in dicionario.items():
+        for alias in (chave if isinstance(chave, tuple) else (chave,)):
+            pares.append((alias, codigo))
+    return pares
+
+
+class ClassificadorGrupos:
+    """Classifica textos em grupos por substring, com regex pré-compilada e memoização.
+
+    Recebe pares (alias, grupo) em ordem de prioridade: o texto vai para o grupo
+    do primeiro alias da lista que aparecer nele, como no laço de substrings
+    original, mas numa única passada da regex por texto distinto. Textos sem
+    nenhum alias vão para o classificador de reserva, se houver, ou para o padrão.
+    """
+
+    def __init__(self, pares, padrao="OUTROS", reserva=None):
+        self.padrao = padrao
+        self.reserva = reserva
+        self._grupo_por_alias = {}
+        for alias, grupo in pares:
+            if isinstance(alias, str) and alias and alias not in self._grupo_por_alias:
+                self._grupo_por_alias[alias] = grupo
+        self._prioridade = {alias: i for i, alias in enumerate(self._grupo_por_alias)}
+        # O lookahead permite casamentos sobrepostos; em cada posição a alternância
+        # devolve o alias de maior prioridade que começa ali
+        self._regex = None
+        if self._grupo_por_alias:
+            alternativas = '|'.join(map(re.escape, self._grupo_por_alias))
+            self._regex = re.compile(f'(?=({alternativas}))')
+        self._memo = {}
+
+    @property
+    def grupo_por_alias(self):
+        """Índice achatado alias -> grupo, na ordem de prioridade."""
+        return dict(self._grupo_por_alias)
+
+    def classificar(self, texto):
+        """Retorna o grupo de um texto."""
+        if texto in self._memo:
+            return self._memo[texto]
+        achados = []
+        if self._regex is not None and isinstance(texto, str):
+            achados = [m.group(1) for m in self._regex.finditer(texto)]
+        if achados:
+            grupo = self._grupo_por_alias[min(achados, key=self._prioridade.__getitem__)]
+        elif self.reserva is not None:
+            grupo = self.reserva.classificar(texto)
+        else:
+            grupo = self.padrao
+        self._memo[texto] = grupo
+        return grupo
+
+    def classificar_serie(self, textos):
+        """Classifica uma série inteira consultando cada texto distinto uma única vez."""
+        distintos = pd.unique(textos.dropna())
+        tabela = pd.Series([self.classificar(texto) for texto in distintos], index=distintos, dtype=object)
+        return textos.map(tabela).fillna(self.padrao)
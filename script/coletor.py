@@ -0,0 +1,179 @@
+import asyncio
+import csv
+import json
+import os
+import threading
+import urllib.parse
+
+from ingestao import BASE_DIR
+from monitoramento import INTERVALO_MONITORAMENTO
+
+# Extrusoras consultadas por HTTP: uma linha por máquina (maquina,url)
+MAQUINAS_PATH = os.path.join(BASE_DIR, '.database', 'maquinas.csv')
+# Tempo máximo (s) de cada consulta e número de consultas abertas ao mesmo tempo
+TEMPO_LIMITE_MAQUINA = float(os.environ.get('DASHBOARD_TEMPO_LIMITE_MAQUINA', '3'))
+MAX_CONSULTAS_SIMULTANEAS = int(os.environ.get('DASHBOARD_CONSULTAS_SIMULTANEAS', '8'))
+
+
+def carregar_maquinas(caminho=MAQUINAS_PATH):
+    """Endereço de status de cada máquina ({} se o arquivo não existir)."""
+    try:
+        with open(caminho, encoding='utf-8', newline='') as f:
+            return {linha['maquina']: linha['url'] for linha in csv.DictReader(f) if linha.get('maquina') and linha.get('url')}
+    except FileNotFoundError:
+        return {}
+
+
+def interpretar_status(texto):
+    """(estado, valor) a partir da página de status da máquina: JSON com "status" e "valor"."""
+    dados = json.loads(texto)
+    return dados.get('status'), dados.get('valor')
+
+
+class _Conexoes:
+    """Conexões HTTP/1.1 ociosas por (host, porta), reaproveitadas entre consultas (keep-alive)."""
+
+    def __init__(self):
+        self._ociosas = {}
+
+    async def abrir(self, chave):
+        """(reader, writer, reaproveitada): uma conexão ociosa da chave ou uma nova."""
+        ociosas = self._ociosas.get(chave, [])
+        while ociosas:
+            reader, writer = ociosas.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        host, porta, segura = chave
+        reader, writer = await asyncio.open_connection(host, porta, ssl=segura or None)
+        return reader, writer, False
+
+    def devolver(self, chave, reader, writer):
+        self._ociosas.setdefault(chave, []).append((reader, writer))
+
+    def fechar(self):
+        for ociosas in self._ociosas.values():
+            for _, writer in ociosas:
+                writer.close()
+        self._ociosas.clear()
+
+
+async def _ler_resposta(reader):
+    """Status, cabeçalhos e corpo de uma resposta HTTP/1.1, e se a conexão pode ser reaproveitada."""
+    linha = await reader.readline()
+    if not linha:
+        raise ConnectionResetError("conexão encerrada pelo servidor")
+    status = int(linha.split()[1])
+    cabecalhos = {}
+    while (linha := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    reaproveitar = cabecalhos.get('connection', '').lower() != 'close'
+    if cabecalhos.get('transfer-encoding', '').lower() == 'chunked':
+        partes = []
+        while (tamanho := int((await reader.readline()).split(b';')[0], 16)):
+            partes.append(await reader.readexactly(tamanho))
+            await reader.readline()
+        await reader.readline()
+        corpo = b''.join(partes)
+    elif 'content-length' in cabecalhos:
+        corpo = await reader.readexactly(int(cabecalhos['content-length']))
+    else:
+        # Sem tamanho declarado o corpo vai até o fim da conexão
+        corpo = await reader.read()
+        reaproveitar = False
+    return status, corpo, reaproveitar
+
+
+class Coletor(threading.Thread):
+    """Thread com um laço asyncio que consulta as páginas de status de todas as máquinas.
+
+    Cada ciclo dispara as consultas em paralelo, no máximo `max_simultaneas` por
+    vez e cada uma limitada a `tempo_limite` segundos, reaproveitando as conexões
+    entre ciclos. Leituras novas vão para o Monitor; uma máquina que não responde
+    fica marcada como sem resposta e mantém a última leitura boa. Ao fim de cada
+    ciclo o Monitor publica um novo retrato, que as páginas leem sem esperar.
+    """
+
+    def __init__(self, maquinas, monitor, intervalo=INTERVALO_MONITORAMENTO, tempo_limite=TEMPO_LIMITE_MAQUINA,
+                 max_simultaneas=MAX_CONSULTAS_SIMULTANEAS, interpretar=interpretar_status):
+        super().__init__(name='coletor-maquinas', daemon=True)
+        self.maquinas = dict(maquinas)
+        self.monitor = monitor
+        self.intervalo = intervalo
+        self.tempo_limite = tempo_limite
+        self.max_simultaneas = max_simultaneas
+        self.interpretar = interpretar
+        self._conexoes = _Conexoes()
+        self._parar = threading.Event()
+
+    async def _buscar(self, url):
+        """Corpo da resposta a um GET em `url`, por uma conexão reaproveitada sempre que possível."""
+        partes = urllib.parse.urlsplit(url)
+        segura = partes.scheme == 'https'
+        chave = (partes.hostname, partes.port or (443 if segura else 80), segura)
+        caminho = (partes.path or '/') + (f'?{partes.query}' if partes.query else '')
+        pedido = f'GET {caminho} HTTP/1.1\r\nHost: {partes.netloc}\r\nConnection: keep-alive\r\n\r\n'.encode('latin-1')
+
+        while True:
+            reader, writer, reaproveitada = await self._conexoes.abrir(chave)
+            try:
+                writer.write(pedido)
+                await writer.drain()
+                status, corpo, reaproveitar = await _ler_resposta(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # O servidor pode ter fechado uma conexão ociosa: tenta de novo com uma nova
+                if reaproveitada:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            break
+
+        if reaproveitar:
+            self._conexoes.devolver(chave, reader, writer)
+        else:
+            writer.close()
+        if status != 200:
+            raise ConnectionError(f"HTTP {status}")
+        return corpo.decode('utf-8')
+
+    async def _consultar(self, maquina, url, semaforo):
+        """Consulta uma máquina e registra a leitura ou a falha no Monitor."""
+        async with semaforo:
+            try:
+                texto = await asyncio.wait_for(self._buscar(url), self.tempo_limite)
+                estado, valor = self.interpretar(texto)
+            except asyncio.TimeoutError:
+                self.monitor.marcar_falha(maquina, f"tempo esgotado após {self.tempo_limite:g}s")
+                return False
+            except Exception as e:
+                self.monitor.marcar_falha(maquina, e)
+                return False
+        self.monitor.registrar(maquina, estado, valor)
+        return True
+
+    async def coletar(self):
+        """Um ciclo de consultas a todas as máquinas; retorna quantas responderam."""
+        semaforo = asyncio.Semaphore(self.max_simultaneas)
+        respostas = await asyncio.gather(*(self._consultar(maquina, url, semaforo) for maquina, url in self.maquinas.items()))
+        self.monitor.publicar()
+        return sum(respostas)
+
+    async def _executar(self):
+        try:
+            while not self._parar.is_set():
+                await self.coletar()
+                await asyncio.to_thread(self._parar.wait, self.intervalo)
+        finally:
+            self._conexoes.fechar()
+
+    def run(self):
+        asyncio.run(self._executar())
+
+    def parar(self):
+        """Encerra a thread no próximo ciclo."""
+        self._parar.set()
@@ -0,0 +1,73 @@
+import math
+
+import pandas as pd
+import streamlit as st
+
+# Compostos exibidos por página no detalhamento (3 por linha)
+COMPOSTOS_POR_PAGINA = 6
+COMPOSTOS_POR_LINHA = 3
+
+
+def filtrar_compostos(compostos, busca):
+    """Compostos cujo nome contém `busca` (sem diferenciar maiúsculas), na ordem original."""
+    compostos = pd.Index(compostos)
+    busca = (busca or '').strip()
+    if not busca:
+        return compostos
+    return compostos[compostos.astype('str').str.contains(busca, case=False, regex=False)]
+
+
+def fatiar_pagina(itens, pagina, por_pagina=COMPOSTOS_POR_PAGINA):
+    """Itens da página `pagina` (começando em 1) e o total de páginas."""
+    total_paginas = max(math.ceil(len(itens) / por_pagina), 1)
+    pagina = min(max(int(pagina), 1), total_paginas)
+    inicio = (pagina - 1) * por_pagina
+    return itens[inicio:inicio + por_pagina], total_paginas
+
+
+def detalhe_por_cor(demanda_por_cor, composto):
+    """Demanda de um composto por cor, da maior para a menor."""
+    detalhe = demanda_por_cor[["Cor", composto]].rename(columns={composto: "Demanda (kg)"})
+    return detalhe.sort_values(by="Demanda (kg)", ascending=False).reset_index(drop=True)
+
+
+def exibir_detalhes_compostos(compostos, demanda_por_cor, chave, por_pagina=COMPOSTOS_POR_PAGINA):
+    """Detalhamento por cor com busca e paginação: só os compostos da página vão para o navegador.
+
+    Cada composto visível vira uma única tabela (Cor, Demanda) em vez de um widget
+    por cor. `chave` separa o estado da busca e da página entre as telas.
+    """
+    chave_busca, chave_pagina = f"{chave}_busca", f"{chave}_pagina"
+    compostos = filtrar_compostos(
+        [composto for composto in compostos if composto in demanda_por_cor.columns],
+        st.session_state.get(chave_busca),
+    )
+    _, total_paginas = fatiar_pagina(compostos, 1, por_pagina)
+    # Uma busca nova pode deixar a página atual fora do intervalo
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = 1
+
+    col_busca, col_pagina = st.columns([3, 1])
+    with col_busca:
+        st.text_input("Buscar composto", key=chave_busca)
+    with col_pagina:
+        pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas,
+                                 step=1, key=chave_pagina)
+
+    if len(compostos) == 0:
+        st.info("Nenhum composto encontrado.")
+        return
+
+    visiveis, _ = fatiar_pagina(compostos, pagina, por_pagina)
+    st.caption(f"{len(compostos)} composto(s) encontrado(s)")
+    for inicio in range(0, len(visiveis), COMPOSTOS_POR_LINHA):
+        cols = st.columns(COMPOSTOS_POR_LINHA)
+        for col, composto in zip(cols, visiveis[inicio:inicio + COMPOSTOS_POR_LINHA]):
+            with col:
+                with st.expander(f"Detalhes do Composto: {composto}"):
+                    st.dataframe(
+                        detalhe_por_cor(demanda_por_cor, composto),
+                        hide_index=True,
+                        width='stretch',
+                        column_config={"Demanda (kg)": st.column_config.NumberColumn("Demanda (kg)", format="%.2f kg")},
+                    )
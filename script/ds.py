@@ -1,108 +1,96 @@
-import locale
+import time
+
+# Início da execução, para medir a primeira renderização da sessão
+inicio_execucao = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-from openpyxl import load_workbook
+from banco import anos_pointing, producao_diaria, resumo_do_ano, resumo_dos_anos, serie_diaria, versoes_fontes
+from registro import COLUNAS_DEMAND, DADOS_PRODUCAO_PATH, obter, sincronizar
 import os
-import plotly.express as px
+from inicializacao import aquecer, medir_primeira_renderizacao
+from formatacao import formatadores_colunas, formatar_numero
+from graficos import figura_em_cache, grafico_tendencia_diaria
+from monitoramento import INTERVALO_AO_VIVO, Monitor, fontes_padrao
+from coletor import Coletor, carregar_maquinas
 
 # Definir o diretório base como o caminho do próprio script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Definir o formato de números como pt-BR
-locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-locale.atof = lambda x: float(x.replace('.', '').replace(',', '.'))  # Ignorar separadores de milhar e considerar apenas 2 casas decimais
-
 def formatar_valores(valor):
     """ Formatar valores numéricos no formato 10.000,00 """
-    return locale.format_string('%.2f', valor / 1000, grouping=True)  # Dividimos por 1000 para mostrar em milhares
+    return formatar_numero(valor, escala=1000)  # Dividimos por 1000 para mostrar em milhares
 
 def formatar_data_brasileira(data):
     """ Formatar data no formato brasileiro dd/mm/yyyy """
     return data.strftime('%d/%  m/%Y')
 
-# Defina os caminhos dos arquivos usando caminhos relativos
-DADOS_POINTING_PATH = os.path.join(BASE_DIR, '.database', 'ACOMPANHAMENTO DE PRODUÇÃO ATUAL-.xlsx')
-DADOS_MONITORING_PATH = os.path.join(BASE_DIR, '.database', 'DATABASE.xlsx')
-DADOS_DEMAND_PATH = os.path.join(BASE_DIR, '.database', 'DATABASE.xlsx')
+# Os caminhos das planilhas ficam no registro de dados (registro.py)
+DADOS_MONITORING_PATH = DADOS_PRODUCAO_PATH
+DADOS_DEMAND_PATH = DADOS_PRODUCAO_PATH
 
-# Função para carregar e limpar dados da aba "Pointing"
-                        # ADICIONAR FORMATAÇÃO DOS VALORES AQUI 
-@st.cache_data
-def carregar_dados_pointing_ajustado(arquivo, sheet_name):
-    
+# Deixa o banco operacional em dia com o apontamento (uma vez por versão da planilha,
+# ou nenhuma com o ingestor ativo); as páginas consultam o banco em vez de manter
+# cópias do DataFrame por sessão
+def pointing_disponivel():
     try:
-        df = pd.read_excel(arquivo, sheet_name=sheet_name, header=0)  # Ignora fórmulas e apenas retorna os valores
-
-        # Limpar e organizar os dados
-        df_cleaned = df.dropna(how='all').iloc[1:, [1, 2, 5, 8, 11]]  # Seleciona as colunas relevantes
-        df_cleaned.columns = ['Data', 'Produção Cobre Realizado', 'Meta/Dia Cobre', 'Produção Alumínio Realizado', 'Meta/Dia Alumínio']
-        
-        df_cleaned['Data'] = pd.to_datetime(df_cleaned['Data'], errors='coerce')
-        df_cleaned.dropna(subset=['Data'], inplace=True)
-
-        # Adicionar coluna "Dia" com contagem que reinicia a cada mês
-        df_cleaned[''] = df_cleaned.groupby(df_cleaned['Data'].dt.to_period("M")).cumcount() + 1 # Testar passar df vazio como argumento
-
-        # Aplicar a formatação brasileira na data
-        df_cleaned['Data'] = df_cleaned['Data'].dt.strftime('%d/%m/%Y')
-
-        # Convertendo as colunas para numérico
-        df_cleaned['Produção Cobre Realizado'] = pd.to_numeric(df_cleaned['Produção Cobre Realizado'], errors='coerce').fillna(0)
-        df_cleaned['Meta/Dia Cobre'] = pd.to_numeric(df_cleaned['Meta/Dia Cobre'], errors='coerce').fillna(0) # ajustar método de calculo
-        df_cleaned['Produção Alumínio Realizado'] = pd.to_numeric(df_cleaned['Produção Alumínio Realizado'], errors='coerce').fillna(0)
-        df_cleaned['Meta/Dia Alumínio'] = pd.to_numeric(df_cleaned['Meta/Dia Alumínio'], errors='coerce').fillna(0) # ajustar método de calculo
-
-        return df_cleaned
+        sincronizar('pointing', ao_falhar=lambda aba, e: st.error(f"Erro ao carregar a aba {aba}: {e}"))
+        return True
     except Exception as e:
-        st.error(f"Erro ao carregar a aba {sheet_name}: {e}")
-        return None
-# Função para carregar todas as abas válidas e processar os dados de pointing
-
-@st.cache_data
-def carregar_todas_abas_ajustado(arquivo):
-    xls = pd.ExcelFile(arquivo)
-    dados_list = []
-    meses_validos = {
-        'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
-        'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
-    }
-
-    for sheet in xls.sheet_names:
-        if '-' in sheet:
-            mes_ano = sheet.split('-')
-            if len(mes_ano) == 2:
-                mes, ano = mes_ano[0].strip(), mes_ano[1].strip()
-                if mes in meses_validos and ano.isdigit():
-                    df_cleaned = carregar_dados_pointing_ajustado(arquivo, sheet)
-                    if df_cleaned is not None:
-                        df_cleaned['Mês'] = mes
-                        df_cleaned['Ano'] = int(ano)
-                        dados_list.append(df_cleaned)
-    
-    return pd.concat(dados_list, ignore_index=True) if dados_list else None
-
-@st.cache_data
-def carregar_dados_monitoring():
- df = pd.read_excel(DADOS_MONITORING_PATH, header=2, sheet = ('ProgramaExtrusão'))
- return df
-@st.cache_data
+        st.error(f"Erro ao importar o apontamento: {e}")
+        return False
+
 def carregar_dados_demand():
     try:
-        wb3 = load_workbook(DADOS_DEMAND_PATH, data_only=True)
-        sheet = wb3.active
-        data = sheet.values
-        columns = next(data)
-        
-        dados = pd.DataFrame(data, columns=columns)  # Corrigir a leitura dos dados
-        dados = dados[['Data', 'Produção Cobre Realizado', 'Produção Alumínio Realizado']]
+        # Leitura em streaming só das colunas usadas, feita uma vez por versão da planilha
+        dados = obter('demand')
         return dados
     except FileNotFoundError:
         st.error(f"Arquivo '{DADOS_DEMAND_PATH}' não encontrado.")
         return None
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados de demanda: {e}")
+        return None
+
+# Aquecimento dos dados da página padrão numa thread, uma única vez por servidor
+@st.cache_resource
+def iniciar_aquecimento():
+    return aquecer(sincronizar=('pointing',))
+
+# Monitoramento das máquinas numa thread própria, uma única vez por servidor; as
+# leituras ficam num buffer circular por máquina e a página só lê esse buffer.
+# As extrusoras listadas em maquinas.csv são consultadas por HTTP pelo coletor
+@st.cache_resource
+def iniciar_monitoramento():
+    monitor = Monitor(fontes_padrao(DADOS_MONITORING_PATH))
+    monitor.start()
+    maquinas = carregar_maquinas()
+    if maquinas:
+        Coletor(maquinas, monitor).start()
+    return monitor
 
 # Funções para cada página
+def exibir_status_maquinas():
+    # Só lê o retrato publicado pelo monitor (compartilhado entre as sessões)
+    situacao = iniciar_monitoramento().estado_atual()
+    if situacao.empty:
+        st.info("Nenhuma leitura de máquina recebida até agora.")
+        return
+    st.dataframe(situacao, hide_index=True, width='stretch',
+                 column_config={'Atualizado em': st.column_config.DatetimeColumn('Atualizado em', format='DD/MM/YYYY HH:mm:ss')})
+    st.caption(f"Exibido às {time.strftime('%H:%M:%S')}")
+
+# Modo ao vivo: a cada intervalo só este fragmento roda de novo, e não o script
+# inteiro (barra lateral, imagem, roteamento das páginas)
+exibir_status_ao_vivo = st.fragment(run_every=INTERVALO_AO_VIVO)(exibir_status_maquinas)
+
 def pagina1():
-    st.header('_Status Máquina_', divider='gray')                     #WEBSCRAPING MALDITO
+    st.header('_Status Máquina_', divider='gray')
+
+    if st.toggle(f"Atualização ao vivo (a cada {INTERVALO_AO_VIVO:g}s)", value=True, key='status_ao_vivo'):
+        exibir_status_ao_vivo()
+    else:
+        exibir_status_maquinas()
 
 # ajustar os o carregamento de dados de alumínio
 # ajustar formatação dos valores do DataFrame META/DIA para apenas 2 casas decimais sejam exibidas depois da vírgula
@@ -111,9 +99,9 @@ def pagina2():
     st.header('_Acompanhamento de Produção_', divider='gray')
 
     # Carregar os dados
-    dados = carregar_todas_abas_ajustado(DADOS_POINTING_PATH)
+    anos = anos_pointing() if pointing_disponivel() else []
 
-    if dados is not None:
+    if anos:
         col1, col2 = st.columns(2)
         with col1:
         # Seleção entre Cobre e Alumínio
@@ -124,68 +112,58 @@ def pagina2():
 
         if comparacao_tipo == 'Comparação por Anos':
             # Usuário seleciona um ou mais anos para análise
-            anos = dados['Ano'].unique() if 'Ano' in dados.columns else []
             anos_selecionados = st.multiselect('Selecione o(s) Ano(s)', anos)
 
             if anos_selecionados:
-                # Filtrar os dados pelos anos selecionados
-                dados_filtrados = dados[dados['Ano'].isin(anos_selecionados)]
+                # Totais por ano agregados no banco, na ordem da seleção
+                resumo_anos = resumo_dos_anos(anos_selecionados, producao_tipo)
                 
                 # Exibir uma tabela com a produção total e a expectativa por ano
-                producao_total_ano = []
-                expectativa_total_ano = []
-                
-                for ano in anos_selecionados:
-                    dados_ano = dados_filtrados[dados_filtrados['Ano'] == ano]
-                    if producao_tipo == 'Cobre':
-                        total_producao_ano = dados_ano['Produção Cobre Realizado'].sum()
-                        expectativa_ano = dados_ano['Meta/Dia Cobre'].sum()
-                    else:
-                        total_producao_ano = dados_ano['Produção Alumínio Realizado'].sum()
-                        expectativa_ano = dados_ano['Meta/Dia Alumínio'].sum()
-
-                    producao_total_ano.append(total_producao_ano)
-                    expectativa_total_ano.append(expectativa_ano)
+                producao_total_ano = resumo_anos['Produção'].tolist()
+                expectativa_total_ano = resumo_anos['Meta'].tolist()
                 
                 # Exibir os dados em formato de tabela
                 st.write("### Relação entre Anos")
                 df_anos = pd.DataFrame({
                     'Ano': anos_selecionados,
-                    'Quantidade Total Produzida': [formatar_valores(val) for val in producao_total_ano],
-                    'Expectativa de Produção': [formatar_valores(val) for val in expectativa_total_ano]
+                    'Quantidade Total Produzida': producao_total_ano,
+                    'Expectativa de Produção': expectativa_total_ano
                 })
                 df_anos.index = df_anos.index + 1  # Ajuste de índice para iniciar do 1
-                st.dataframe(df_anos, use_container_width=True)
+                # Valores seguem numéricos; só a exibição sai em milhares no formato 10.000,00
+                formatadores = formatadores_colunas(df_anos, ['Quantidade Total Produzida', 'Expectativa de Produção'], escala=1000)
+                st.dataframe(df_anos.style.format(formatadores, na_rep=''), width='stretch')
 
                 # Gráfico de setores para a relação entre os anos
-                fig_anos = px.pie(pd.DataFrame({
+                import plotly.express as px  # importado só quando há gráfico
+                # Figuras reaproveitadas enquanto os dados e a seleção forem os mesmos
+                fig_anos = figura_em_cache(versoes_fontes(), 'pagina2:anos', (producao_tipo, anos_selecionados),
+                                           lambda: px.pie(pd.DataFrame({
                     'Ano': anos_selecionados,
                     'Quantidade Total Produzida': producao_total_ano
                 }), names='Ano', values='Quantidade Total Produzida',
-                                  title=f"Distribuição da Produção nos Anos Selecionados - {producao_tipo}")
+                                  title=f"Distribuição da Produção nos Anos Selecionados - {producao_tipo}"))
                 st.plotly_chart(fig_anos)
 
+                # Tendência diária dos anos selecionados, reduzida no servidor se passar do orçamento de pontos
+                st.write("### Tendência Diária")
+                fig_tendencia = figura_em_cache(versoes_fontes(), 'pagina2:tendencia', (producao_tipo, anos_selecionados),
+                                                lambda: grafico_tendencia_diaria(serie_diaria(anos_selecionados, producao_tipo), producao_tipo))
+                st.plotly_chart(fig_tendencia)
+
         elif comparacao_tipo == 'Comparação por Meses':
             # O usuário seleciona um ano
-            anos = dados['Ano'].unique() if 'Ano' in dados.columns else []
             ano_selecionado = st.selectbox('Selecione o Ano', anos)
 
             if ano_selecionado:
-                # Filtrar os dados pelo ano selecionado
-                dados_filtrados = dados[dados['Ano'] == ano_selecionado]
-                
+                # Resumo mensal agregado no banco, com os meses na ordem da pasta
+                resumo_meses = resumo_do_ano(ano_selecionado, producao_tipo)
+                meses = resumo_meses.index
+
                 # Exibir uma tabela com a produção de cada mês do ano selecionado
-                meses = dados_filtrados['Mês'].unique()
-                for mes in meses:
-                    # Filtrar dados do mês
-                    dados_mes = dados_filtrados[dados_filtrados['Mês'] == mes].copy()
-
-                    if producao_tipo == 'Cobre':
-                        total_mes = dados_mes['Produção Cobre Realizado'].sum()
-                        expectativa_mes = dados_mes['Meta/Dia Cobre'].iloc[0] * len(dados_mes.index)
-                    else:
-                        total_mes = dados_mes['Produção Alumínio Realizado'].sum()
-                        expectativa_mes = dados_mes['Meta/Dia Alumínio'].iloc[0] * len(dados_mes.index) # ajustar método de calculo
+                for mes, resumo_mes in resumo_meses.iterrows():
+                    total_mes = resumo_mes['Produção']
+                    expectativa_mes = resumo_mes['Meta Primeiro Dia'] * resumo_mes['Dias'] # ajustar método de calculo
                         
                     # Exibir a produção e expectativa do mês fora do toggle
                     col1, col2 = st.columns([1, 1])
@@ -197,20 +175,23 @@ def pagina2():
                     # Toggle list para mostrar os detalhes do mês
                     with st.expander(f"Exibir detalhes de {mes}"):
                         st.write(f"### Produção Diária - {mes}/{ano_selecionado}")
-                        # Exibir DataFrame com a coluna "Dia" como índice
-                        dados_mes.set_index([''], inplace=True) # testar passar argumento vazio
-                        st.dataframe(dados_mes[['Data', f'Produção {producao_tipo} Realizado', f'Meta/Dia {producao_tipo}']], use_container_width=True)
+                        # Linhas diárias do mês consultadas no banco, com a coluna "Dia" como índice
+                        dados_mes = producao_diaria(ano_selecionado, mes, producao_tipo)
+                        st.dataframe(dados_mes, width='stretch',
+                                     column_config={'Data': st.column_config.DateColumn('Data', format='DD/MM/YYYY')})
                         
                 # Gráfico de setores para a relação entre os meses do ano selecionado
                 df_meses = pd.DataFrame({
                     'Meses': meses,
-                    'Quantidade Total Produzida': [dados_filtrados[dados_filtrados['Mês'] == m][f'Produção {producao_tipo} Realizado'].sum() for m in meses],
-                    'Expectativa de Produção': [dados_filtrados[dados_filtrados['Mês'] == m][f'Meta/Dia {producao_tipo}'].sum() for m in meses]
+                    'Quantidade Total Produzida': resumo_meses['Produção'].to_numpy(),
+                    'Expectativa de Produção': resumo_meses['Meta'].to_numpy()
                 })
 
                 st.write(f"### Distribuição da Produção Mensal - {ano_selecionado}")
-                fig_meses = px.pie(df_meses, names='Meses', values='Quantidade Total Produzida',
-                                   title=f"Distribuição da Produção nos Meses de {ano_selecionado} - {producao_tipo}")
+                import plotly.express as px  # importado só quando há gráfico
+                fig_meses = figura_em_cache(versoes_fontes(), 'pagina2:meses', (producao_tipo, ano_selecionado),
+                                            lambda: px.pie(df_meses, names='Meses', values='Quantidade Total Produzida',
+                                   title=f"Distribuição da Produção nos Meses de {ano_selecionado} - {producao_tipo}"))
                 st.plotly_chart(fig_meses)
 
                 # Exibir total produzido no ano, expectativa de produção e média anual
@@ -231,11 +212,14 @@ def pagina2():
 
 def pagina3():
      st.header('_Demanda por Composto_', divider='gray')
-     dados = carregar_dados_demand(DADOS_DEMAND_PATH)
-     st.dataframe(dados.iloc[:, 17:])
+     dados = carregar_dados_demand()
+     if dados is not None:
+         # Colunas de produção realizada lidas pelo registro (COLUNAS_DEMAND)
+         st.dataframe(dados[COLUNAS_DEMAND])
      
 # Interface do sistema
 st.set_page_config(page_title="Dashboard", page_icon="💡", layout="wide")
+iniciar_aquecimento()
 
 imagem_caminho = os.path.join(BASE_DIR, '.uploads', 'Logo.png')
 if os.path.exists(imagem_caminho):
@@ -258,4 +242,6 @@ if st.session_state.pagina_atual == 'pagina1':
 elif st.session_state.pagina_atual == 'pagina2':
     pagina2()
 elif st.session_state.pagina_atual == 'pagina3':
-    pagina3()
\ No newline at end of file
+    pagina3()
+
+medir_primeira_renderizacao(st.session_state, inicio_execucao)
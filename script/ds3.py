@@ -1,23 +1,29 @@
+import time
+
+# Início da execução, para medir a primeira renderização da sessão
+inicio_execucao = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import os
-import locale
-
-# Configurações gerais
-BASE_DIR = os.getcwd()
-DADOS_PRODUCAO_PATH = os.path.join(BASE_DIR, ".database", "DATABASE.xlsx")  # Programa de Extrusão
-DADOS_ESTOQUE_PATH = os.path.join(BASE_DIR, ".database", "Novembro-2024 - Copia.xlsx")  # Almoxarifado
+from registro import obter, versao_servida
+from classificacao import ClassificadorGrupos, achatar_aliases, extrair_cores
+from inicializacao import aquecer, medir_primeira_renderizacao
+from formatacao import destacar_saldo, formatar_numero
+from detalhes import exibir_detalhes_compostos
+from graficos import figura_em_cache
 
 st.set_page_config(page_title="Dashboard Operacional", layout="wide")
 
-# Configuração para formato de números em pt-BR
-locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-locale.atof = lambda x: float(x.replace('.', '').replace(',', '.'))  # Ajustar separadores de milhar
+# Aquecimento dos dados da página padrão numa thread, uma única vez por servidor
+@st.cache_resource
+def iniciar_aquecimento():
+    return aquecer(obter=('programa', 'estoque'))
+
+iniciar_aquecimento()
 
 def formatar_valores(valor):
     """ Formatar valores numéricos no formato 10.000,00 """
-    return locale.format_string('%.2f', valor)
+    return formatar_numero(valor)
 
 # Dicionário para exceções manuais de grupos
 dicionario_cores = {
@@ -37,58 +43,31 @@ dicionario_cores = {
 
 # }
 # Funções utilitárias
-def carregar_dados(caminho, aba, header):
-    """Carrega dados de uma planilha Excel."""
+def carregar_dados_producao():
+    """Carrega o Programa de Extrusão pelo registro de dados (lido uma vez por versão da planilha)."""
     try:
-        dados = pd.read_excel(caminho, sheet_name=aba, header=header)
-        return dados
+        return obter('programa')
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
         return None
 
-def carregar_dados_estoque(caminho):
-    """Carrega dados do almoxarifado, soma os estoques por grupo e retorna o saldo."""
+def carregar_dados_estoque():
+    """Estoque por produto na última coluna preenchida do almoxarifado (snapshot do registro)."""
     try:
-        dados = pd.read_excel(caminho, sheet_name="Folha1", header=1)
-
-        # Identificar as colunas de datas
-        colunas_datas = dados.columns[6:]
-        ultima_coluna_valida = next(
-            (col for col in reversed(colunas_datas) if dados[col].notnull().any()), None
-        )
-
-        if not ultima_coluna_valida:
-            raise ValueError("Nenhuma coluna com valores atualizados foi encontrada.")
-
-        # Extrair dados relevantes
-        dados_estoque = dados[["Produto", ultima_coluna_valida]].copy()
-        dados_estoque = dados_estoque.rename(columns={ultima_coluna_valida: "Estoque (kg)"})
-        dados_estoque = dados_estoque.dropna(subset=["Produto", "Estoque (kg)"])
-
-        dados_estoque = dados_estoque.groupby("Produto", as_index=False).sum()
-        
-        return dados_estoque
+        return obter('estoque')
     except Exception as e:
         st.error(f"Erro ao carregar os dados de estoque: {e}")
         return None
 
-def extrair_cor(descricao):
-    """Extrai a cor de um material a partir da descrição."""
-    if pd.isna(descricao):
-        return "Indefinido"
-    if '-' in descricao:
-        return descricao.split('-')[-1].strip()
-    return "Indefinido"
-
-def identificar_grupo_dinamico(composto, grupos_demanda):
-    """Identifica o grupo de um composto com base na demanda e nas exceções."""
-    for grupo in grupos_demanda:
-        if grupo in composto:
-            return grupo
-    for grupo_invalido, grupo_correto in dicionario_cores.items():
-        if grupo_invalido in composto:
-            return grupo_correto
-    return "OUTROS"
+@st.cache_resource
+def classificador_cores():
+    """Compila uma única vez o índice achatado alias -> código de dicionario_cores."""
+    return ClassificadorGrupos(achatar_aliases(dicionario_cores), padrao="OUTROS")
+
+def montar_classificador_grupos(grupos_demanda):
+    """Monta o classificador de grupos: primeiro os grupos da demanda, depois as exceções."""
+    pares = [(grupo, grupo) for grupo in grupos_demanda]
+    return ClassificadorGrupos(pares, padrao="OUTROS", reserva=classificador_cores())
 
 def extrair_grupos_dinamicos(demanda_total):
     """Extrai os grupos a partir da demanda."""
@@ -98,7 +77,7 @@ def processar_demanda(dados_producao):
     """Processa demandas e organiza por composto e cor."""
     colunas_descritivas = dados_producao.columns[:18]
     colunas_compostos = dados_producao.columns[18:]
-    dados_producao["Cor"] = dados_producao["DESCRIÇÃO"].apply(extrair_cor)
+    dados_producao["Cor"] = extrair_cores(dados_producao["DESCRIÇÃO"])
     demanda_total = dados_producao[colunas_compostos].sum()
     demanda_por_cor = dados_producao.groupby("Cor")[colunas_compostos].sum().reset_index()
     return demanda_total, demanda_por_cor
@@ -106,16 +85,13 @@ def processar_demanda(dados_producao):
 def agregar_dados_por_grupo(demanda_total, dados_estoque):
     """Consolida a demanda e o estoque por grupo."""
     grupos_demanda = extrair_grupos_dinamicos(demanda_total)
+    classificador = montar_classificador_grupos(grupos_demanda)
     demanda_total = demanda_total.reset_index()
-    demanda_total["Grupo"] = demanda_total["index"].apply(
-        lambda composto: identificar_grupo_dinamico(composto, grupos_demanda)
-    )
+    demanda_total["Grupo"] = classificador.classificar_serie(demanda_total["index"])
     demanda_agrupada = demanda_total.groupby("Grupo")[0].sum().reset_index()
     demanda_agrupada = demanda_agrupada.rename(columns={0: "Demanda (kg)"})
 
-    dados_estoque["Grupo"] = dados_estoque["Produto"].apply(
-        lambda produto: identificar_grupo_dinamico(produto, grupos_demanda)
-    )
+    dados_estoque["Grupo"] = classificador.classificar_serie(dados_estoque["Produto"])
     estoque_agrupado = dados_estoque.groupby("Grupo")["Estoque (kg)"].sum().reset_index()
     estoque_agrupado = estoque_agrupado.rename(columns={"Estoque (kg)": "Estoque Total (kg)"})
 
@@ -129,8 +105,11 @@ def pagina_demanda_polimeros():
     st.title("Demanda de Polímeros")
     st.write("### Comparação entre demanda de produção e estoque de polímeros")
 
-    dados_producao = carregar_dados(DADOS_PRODUCAO_PATH, "ProgramaExtrusão", 4)
-    dados_estoque = carregar_dados_estoque(DADOS_ESTOQUE_PATH)
+    # Versões lidas antes dos dados: uma publicação no meio do caminho deixa, no
+    # máximo, dados novos sob a chave antiga, nunca dados antigos sob a nova
+    versoes = (versao_servida('programa'), versao_servida('estoque'))
+    dados_producao = carregar_dados_producao()
+    dados_estoque = carregar_dados_estoque()
 
     if dados_producao is not None and dados_estoque is not None:
         demanda_total, demanda_por_cor = processar_demanda(dados_producao)
@@ -138,33 +117,28 @@ def pagina_demanda_polimeros():
 
         st.subheader("Resumo por Grupo")
         st.dataframe(
-            df_consolidado.style.applymap(
-                lambda x: "background-color: red" if x < 0 else "background-color: green",
-                subset=["Saldo (kg)"]
-            )
+            destacar_saldo(df_consolidado)
         )
 
         st.subheader("Distribuição por Grupo")
-        fig = px.bar(
+        import plotly.express as px  # importado só quando há gráfico
+        # Figura reaproveitada enquanto os dados não mudarem
+        fig = figura_em_cache(versoes, 'ds3:grupos', (), lambda: px.bar(
             df_consolidado,
             x="Grupo",
             y=["Demanda (kg)", "Estoque Total (kg)"],
             barmode="group",
             title="Comparativo de Demanda e Estoque por Grupo"
-        )
+        ))
         st.plotly_chart(fig)
 
         st.subheader("Detalhes por Composto")
-        for composto in demanda_por_cor.columns[1:]:
-            with st.expander(f"Composto: {composto}"):
-                detalhamento = demanda_por_cor[["Cor", composto]].rename(
-                    columns={composto: "Demanda (kg)"}
-                )
-                detalhamento = detalhamento.sort_values(by="Demanda (kg)", ascending=False)
-                
-                st.dataframe(detalhamento)
+        # Só os compostos da página atual (ou da busca) são renderizados
+        exibir_detalhes_compostos(demanda_por_cor.columns[1:], demanda_por_cor, chave="detalhes_grupo")
     else:
         st.error("Erro ao carregar os dados das planilhas.")
 
 # Execução
 pagina_demanda_polimeros()
+
+medir_primeira_renderizacao(st.session_state, inicio_execucao)
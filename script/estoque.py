@@ -0,0 +1,190 @@
+from datetime import datetime
+from functools import lru_cache
+import json
+import os
+import re
+
+import pandas as pd
+
+from ingestao import BASE_DIR, _chave, _gravar_snapshot, _ler_snapshot, impressao_digital, ler_planilha
+
+# Layout da planilha do almoxarifado
+ABA_ESTOQUE = "Folha1"
+LINHA_CABECALHO_ESTOQUE = 1
+PRIMEIRA_COLUNA_DATAS = 6  # As datas começam na coluna 6
+
+# Série histórica (Data, Produto, kg), uma partição por coluna de data
+SERIE_ESTOQUE_DIR = os.path.join(BASE_DIR, '.cache', 'estoque')
+
+
+def ler_ultima_coluna_estoque(caminho, aba=ABA_ESTOQUE, header=LINHA_CABECALHO_ESTOQUE):
+    """Produto e última coluna de data preenchida da aba, numa única passada read_only.
+
+    O cabeçalho dá a posição do Produto; de cada linha só ficam o produto e o valor
+    da última coluna (a partir de PRIMEIRA_COLUNA_DATAS) preenchida até ali. Uma
+    coluna que passa a ser a última preenchida estava vazia em todas as linhas
+    anteriores, então os valores já guardados viram nulos sem reler nada.
+    Retorna (produtos, valores, rótulo da coluna).
+    """
+    from openpyxl import load_workbook  # importado só quando a planilha é de fato aberta
+
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = workbook[aba].iter_rows(min_row=header + 1, values_only=True)
+        cabecalho = list(next(linhas, ()))
+        if "Produto" not in cabecalho:
+            raise ValueError("A coluna 'Produto' não foi encontrada na planilha de estoque.")
+        posicao_produto = cabecalho.index("Produto")
+
+        produtos, valores = [], []
+        ultima = PRIMEIRA_COLUNA_DATAS - 1
+        for linha in linhas:
+            resto = linha[ultima + 1:]
+            # tuple.count percorre a linha em C; o laço em Python só roda quando a última coluna avança
+            if resto.count(None) != len(resto):
+                ultima += max(posicao for posicao, valor in enumerate(resto, 1) if valor is not None)
+                valores = [None] * len(valores)
+            produtos.append(linha[posicao_produto] if posicao_produto < len(linha) else None)
+            valores.append(linha[ultima] if PRIMEIRA_COLUNA_DATAS <= ultima < len(linha) else None)
+    finally:
+        workbook.close()
+
+    if ultima < PRIMEIRA_COLUNA_DATAS:
+        raise ValueError("Nenhuma coluna com valores atualizados foi encontrada.")
+    return produtos, valores, cabecalho[ultima] if ultima < len(cabecalho) else None
+
+
+@lru_cache(maxsize=4)
+def _estoque_atual(caminho, versao):
+    """Estoque agrupado por produto na versão informada do arquivo (memoizado)."""
+    produtos, valores, ultima_coluna_valida = ler_ultima_coluna_estoque(caminho)
+    dados_estoque = pd.DataFrame({
+        "Produto": pd.Series(produtos, dtype=object),
+        "Estoque (kg)": pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").astype("float64"),
+    })
+    dados_estoque = dados_estoque.dropna(subset=["Produto", "Estoque (kg)"])
+    dados_estoque = dados_estoque.groupby("Produto", as_index=False).sum()
+    dados_estoque.attrs["data_estoque"] = ultima_coluna_valida
+    return dados_estoque
+
+
+def carregar_estoque_atual(caminho):
+    """Retorna o estoque da última data preenchida, somado por produto.
+
+    O resultado fica em memória por caminho + impressão digital do arquivo, então
+    reruns não releem a planilha; cada chamada recebe uma cópia própria.
+    """
+    caminho = os.path.abspath(caminho)
+    return _estoque_atual(caminho, impressao_digital(caminho)).copy()
+
+
+def _data_cabecalho(coluna):
+    """Data de um cabeçalho da planilha, ou None se ele não for uma data.
+
+    O pandas renomeia cabeçalhos repetidos para texto com sufixo ('2024-11-13 00:00:00.1');
+    o sufixo é removido para que a coluna continue sendo reconhecida como data.
+    """
+    if isinstance(coluna, datetime):
+        return coluna
+    if isinstance(coluna, str) and _CABECALHO_DATA_REPETIDO.match(coluna):
+        return datetime.fromisoformat(coluna.rsplit('.', 1)[0])
+    return None
+
+
+_CABECALHO_DATA_REPETIDO = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+$')
+
+
+def colunas_datas_estoque(dados):
+    """(data, coluna) das colunas de data que formam a série, em ordem de data.
+
+    Uma data repetida abre um novo bloco de datas na aba (a grade do mês copiada
+    mais à direita). Vale o último bloco com algum valor preenchido, o mesmo de onde
+    carregar_estoque_atual tira a última coluna preenchida.
+    """
+    blocos = [[]]
+    for coluna in dados.columns:
+        data = _data_cabecalho(coluna)
+        if data is None:
+            continue
+        if any(data == anterior for anterior, _ in blocos[-1]):
+            blocos.append([])
+        blocos[-1].append((data, coluna))
+    preenchidos = [bloco for bloco in blocos if bloco and dados[[coluna for _, coluna in bloco]].notna().any(axis=None)]
+    bloco = preenchidos[-1] if preenchidos else blocos[-1]
+    return sorted(bloco, key=lambda item: item[0])
+
+
+def _derreter_coluna(produtos, valores, data):
+    """Converte uma coluna de data da planilha em linhas (Data, Produto, kg) somadas por produto."""
+    longo = pd.DataFrame({"Produto": produtos, "kg": pd.to_numeric(valores, errors="coerce")})
+    longo = longo.dropna().groupby("Produto", as_index=False)["kg"].sum()
+    longo.insert(0, "Data", pd.Timestamp(data))
+    return longo.astype({"Produto": "str", "kg": "float64"})
+
+
+def atualizar_serie_estoque(caminho):
+    """Sincroniza o armazenamento colunar da série de estoque com a planilha.
+
+    Cada coluna de data vira uma partição Parquet própria. O manifesto guarda a
+    assinatura de cada coluna, então só colunas novas ou alteradas são derretidas
+    e gravadas; partições de datas que sumiram da planilha são removidas.
+    Retorna a lista de arquivos das partições, em ordem de data.
+    """
+    caminho = os.path.abspath(caminho)
+    pasta = os.path.join(SERIE_ESTOQUE_DIR, _chave(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    manifesto_caminho = os.path.join(pasta, 'manifesto.json')
+    try:
+        with open(manifesto_caminho, encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        manifesto = {}
+
+    dados = ler_planilha(caminho, ABA_ESTOQUE, LINHA_CABECALHO_ESTOQUE)
+
+    alterado = False
+    vigentes = {}
+    for data_coluna, coluna in colunas_datas_estoque(dados):
+        data = data_coluna.strftime('%Y-%m-%d')
+        assinatura = str(int(pd.util.hash_pandas_object(dados[["Produto", coluna]], index=False).sum()))
+        registro = manifesto.get(data, {})
+        if registro.get('assinatura') == assinatura and os.path.exists(os.path.join(pasta, registro.get('arquivo', ''))):
+            vigentes[data] = registro
+            continue
+        longo = _derreter_coluna(dados["Produto"], dados[coluna], data_coluna)
+        destino = _gravar_snapshot(longo, os.path.join(pasta, data))
+        vigentes[data] = {'assinatura': assinatura, 'arquivo': os.path.basename(destino)}
+        alterado = True
+
+    for data, registro in manifesto.items():
+        if data not in vigentes:
+            alterado = True
+            try:
+                os.remove(os.path.join(pasta, registro['arquivo']))
+            except OSError:
+                pass
+
+    if alterado:
+        temporario = f"{manifesto_caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(vigentes, f)
+        os.replace(temporario, manifesto_caminho)
+    return [os.path.join(pasta, registro['arquivo']) for registro in vigentes.values()]
+
+
+@lru_cache(maxsize=4)
+def _serie_estoque(caminho, versao):
+    """Série de estoque da versão informada do arquivo, indexada por (Data, Produto)."""
+    particoes = [_ler_snapshot(arquivo) for arquivo in atualizar_serie_estoque(caminho)]
+    colunas = {"Data": "datetime64[ns]", "Produto": "str", "kg": "float64"}
+    particoes = [particao for particao in particoes if not particao.empty]
+    serie = pd.concat(particoes, ignore_index=True) if particoes else pd.DataFrame(columns=list(colunas))
+    serie = serie.astype(colunas).set_index(["Data", "Produto"]).sort_index()
+    return serie
+
+
+def carregar_serie_estoque(caminho):
+    """Retorna a série histórica de estoque (índice Data, Produto; coluna kg)."""
+    caminho = os.path.abspath(caminho)
+    return _serie_estoque(caminho, impressao_digital(caminho)).copy()
+
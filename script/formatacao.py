@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Formatação de números no padrão pt-BR (10.000,00) sem depender do locale do
+# processo: o setlocale é global e não é seguro entre sessões concorrentes
+
+
+def formatar_numeros(valores, escala=1, casas=2):
+    """Formata uma coluna inteira de números como 10.000,00, dividindo antes por `escala`.
+
+    Trabalha sobre o array todo (np.strings) em vez de valor a valor. Nulos (None,
+    NaN, pd.NA) viram texto vazio. Uma Series volta como Series de texto com o mesmo
+    índice; qualquer outra entrada volta como array NumPy de texto.
+    """
+    numeros = pd.Series(valores, copy=False).to_numpy('float64', na_value=np.nan) / escala
+    texto = _formatar_array(numeros, casas) if numeros.size else numeros.astype('str')
+    if isinstance(valores, pd.Series):
+        return pd.Series(texto, index=valores.index, name=valores.name, dtype='str')
+    return texto
+
+
+def _unidades(numeros, casas):
+    """Valores absolutos em centésimos (ou na casa pedida), arredondados como '%.2f'.
+
+    np.rint arredonda o produto já aproximado; nos valores a um fio do meio-termo
+    a decisão é refeita pelo próprio '%.*f', que arredonda o valor binário exato.
+    """
+    escalados = np.abs(numeros) * 10 ** casas
+    unidades = np.rint(escalados)
+    duvidosos = np.flatnonzero(np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6)
+    for i in duvidosos:
+        unidades[i] = int(('%.*f' % (casas, abs(numeros[i]))).replace('.', ''))
+    return unidades.astype('int64')
+
+
+def _formatar_array(numeros, casas):
+    """Núcleo de formatar_numeros para um array float64 não vazio."""
+    nulos = ~np.isfinite(numeros)
+    fator = 10 ** casas
+    unidades = _unidades(np.where(nulos, 0, numeros), casas)
+
+    # Parte inteira agrupada de 3 em 3 dígitos: alinha à direita com espaços,
+    # junta as fatias com '.' e remove o preenchimento da esquerda
+    inteiros = (unidades // fator).astype('str')
+    largura = -(-int(np.strings.str_len(inteiros).max()) // 3) * 3
+    alinhados = np.strings.rjust(inteiros, largura)
+    texto = np.strings.slice(alinhados, 0, 3)
+    for inicio in range(3, largura, 3):
+        texto = np.strings.add(np.strings.add(texto, '.'), np.strings.slice(alinhados, inicio, inicio + 3))
+    texto = np.strings.lstrip(texto, ' .')
+
+    if casas > 0:
+        decimais = np.strings.zfill((unidades % fator).astype('str'), casas)
+        texto = np.strings.add(np.strings.add(texto, ','), decimais)
+    texto = np.where((numeros < 0) & (unidades > 0), np.strings.add('-', texto), texto)
+    return np.where(nulos, '', texto)
+
+
+# Troca dos separadores do formato en-US ('10,000.00') pelos do pt-BR
+_SEPARADORES_PT_BR = str.maketrans({',': '.', '.': ','})
+
+
+def formatar_numero(valor, escala=1, casas=2):
+    """Formata um único número como 10.000,00 (texto vazio para nulos, inclusive pd.NA)."""
+    if pd.isna(valor) or not np.isfinite(valor):
+        return ''
+    # Arredondamento do próprio '%.2f'; só os separadores mudam para pt-BR
+    numero = float(valor) / escala
+    texto = f'{abs(numero):,.{casas}f}'.translate(_SEPARADORES_PT_BR)
+    return f'-{texto}' if numero < 0 and texto.strip('0.,') else texto
+
+
+def formatadores_colunas(tabela, colunas, escala=1, casas=2):
+    """Formatadores de Styler.format para as `colunas`: os dados seguem numéricos.
+
+    Cada coluna é formatada de uma vez por formatar_numeros; a célula só consulta
+    o texto pronto do seu valor. Use com na_rep='' para os nulos.
+    """
+    formatadores = {}
+    for coluna in colunas:
+        valores = tabela[coluna].dropna().unique()
+        formatadores[coluna] = dict(zip(valores.tolist(), formatar_numeros(valores, escala, casas).tolist())).__getitem__
+    return formatadores
+
+
+# Destaque do saldo: vermelho quando falta material, verde caso contrário
+DESTAQUE_NEGATIVO = "background-color: red"
+DESTAQUE_POSITIVO = "background-color: green"
+# Acima desse número de células a tabela sai sem CSS por célula
+LIMITE_CELULAS_DESTAQUE = 100_000
+
+
+def cores_saldo(valores):
+    """CSS de cada célula do saldo, calculado de uma vez para a coluna inteira (np.where)."""
+    return np.where(np.asarray(valores, dtype='float64') < 0, DESTAQUE_NEGATIVO, DESTAQUE_POSITIVO)
+
+
+def destacar_saldo(tabela, coluna="Saldo (kg)", cores=None, limite_celulas=LIMITE_CELULAS_DESTAQUE):
+    """Styler com a coluna de saldo colorida por Styler.apply, coluna a coluna.
+
+    `cores` aceita o resultado de cores_saldo já calculado (e guardado em cache
+    junto com a tabela). Tabelas com mais de `limite_celulas` células voltam como
+    DataFrame puro, sem CSS por célula; limite_celulas=None desliga o limite.
+    """
+    if limite_celulas is not None and tabela.size > limite_celulas:
+        return tabela
+    cores = cores_saldo(tabela[coluna]) if cores is None else cores
+    return tabela.style.apply(lambda _: cores, subset=[coluna])
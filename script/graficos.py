@@ -0,0 +1,108 @@
+from collections import OrderedDict
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Figuras prontas compartilhadas por todas as sessões, das mais para as menos recentes
+MAX_FIGURAS = 64
+# Acima desse número de pontos por série, a tendência diária é reduzida no servidor
+ORCAMENTO_PONTOS = 2000
+
+_figuras = OrderedDict()
+_trava_figuras = threading.Lock()
+
+
+def _congelar(estado):
+    """Converte o estado dos widgets (listas, dicts) numa chave imutável."""
+    if isinstance(estado, dict):
+        return tuple(sorted((chave, _congelar(valor)) for chave, valor in estado.items()))
+    if isinstance(estado, (list, tuple, set, pd.Index, np.ndarray)):
+        return tuple(_congelar(valor) for valor in estado)
+    return estado
+
+
+def figura_em_cache(versao, pagina, estado, montar):
+    """Figura Plotly de (versão dos dados, página, estado dos widgets), montada só na primeira vez.
+
+    `montar()` só roda quando a combinação ainda não está no cache; reruns com o
+    mesmo estado reaproveitam a figura pronta. As figuras são compartilhadas entre
+    sessões e não devem ser alteradas por quem as recebe.
+    """
+    chave = (_congelar(versao), pagina, _congelar(estado))
+    with _trava_figuras:
+        if chave in _figuras:
+            _figuras.move_to_end(chave)
+            return _figuras[chave]
+    figura = montar()
+    with _trava_figuras:
+        _figuras[chave] = figura
+        _figuras.move_to_end(chave)
+        while len(_figuras) > MAX_FIGURAS:
+            _figuras.popitem(last=False)
+    return figura
+
+
+def limpar_figuras():
+    """Esvazia o cache de figuras."""
+    with _trava_figuras:
+        _figuras.clear()
+
+
+def indices_lttb(x, y, limite):
+    """Posições dos pontos mantidos pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada balde intermediário, o ponto que
+    forma o maior triângulo com o ponto escolhido antes e a média do balde seguinte,
+    preservando picos e vales da série. Séries dentro do limite voltam inteiras.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    limites = np.linspace(1, n - 1, limite - 1).astype('int64')
+    escolhidos = np.empty(limite, dtype='int64')
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for balde in range(limite - 2):
+        inicio, fim = limites[balde], max(limites[balde + 1], limites[balde] + 1)
+        proximo_fim = limites[balde + 2] if balde + 2 < len(limites) else n
+        media_x = x[fim:proximo_fim].mean() if proximo_fim > fim else x[-1]
+        media_y = y[fim:proximo_fim].mean() if proximo_fim > fim else y[-1]
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+def reduzir_serie(dados, coluna_x, colunas_y, limite=ORCAMENTO_PONTOS):
+    """Linhas de `dados` mantidas pelo LTTB em cada coluna de `colunas_y` (união, em ordem).
+
+    O orçamento é dividido entre as colunas, então o resultado nunca passa de `limite` linhas.
+    """
+    if len(dados) <= limite:
+        return dados
+    limite_coluna = max(limite // len(colunas_y), 3)
+    x = dados[coluna_x]
+    x = x.astype('int64') if pd.api.types.is_datetime64_any_dtype(x) else x
+    x = x.to_numpy(dtype='float64')
+    posicoes = np.unique(np.concatenate([
+        indices_lttb(x, dados[coluna].fillna(0).to_numpy(dtype='float64'), limite_coluna)
+        for coluna in colunas_y
+    ]))
+    return dados.iloc[posicoes]
+
+
+def grafico_tendencia_diaria(dados, material, limite=ORCAMENTO_PONTOS, titulo=None):
+    """Linha diária de produção e meta de um material a partir do apontamento limpo."""
+    import plotly.express as px  # importado só quando há gráfico
+
+    coluna_producao = f'Produção {material} Realizado'
+    coluna_meta = f'Meta/Dia {material}'
+    serie = dados[['Data', coluna_producao, coluna_meta]].dropna(subset=['Data']).sort_values('Data')
+    serie = reduzir_serie(serie, 'Data', [coluna_producao, coluna_meta], limite)
+    return px.line(serie, x='Data', y=[coluna_producao, coluna_meta],
+                   title=titulo or f"Tendência Diária - {material}")
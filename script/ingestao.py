@@ -0,0 +1,563 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+# Diretório onde ficam os snapshots colunares das planilhas
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOTS_DIR = os.path.join(BASE_DIR, '.cache', 'snapshots')
+INCREMENTAL_DIR = os.path.join(BASE_DIR, '.cache', 'incremental')
+
+# Abas mensais válidas no formato "Mês-Ano" e colunas usadas do apontamento
+MESES = [
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
+]
+MESES_VALIDOS = set(MESES)
+COLUNAS_POINTING = [1, 2, 5, 8, 11]
+NOMES_COLUNAS_POINTING = ['Data', 'Produção Cobre Realizado', 'Meta/Dia Cobre', 'Produção Alumínio Realizado', 'Meta/Dia Alumínio']
+
+# Esquema compacto do apontamento limpo: a data fica como datetime64 e só é
+# formatada na exibição; quantidades em float32 e contadores em int16
+ESQUEMA_POINTING = {
+    'Produção Cobre Realizado': 'float32',
+    'Meta/Dia Cobre': 'float32',
+    'Produção Alumínio Realizado': 'float32',
+    'Meta/Dia Alumínio': 'float32',
+    '': 'int16',
+    'Mês': pd.CategoricalDtype(MESES),
+    'Ano': 'int16',
+}
+# Muda sempre que o esquema acima mudar, para descartar o histórico incremental antigo
+VERSAO_ESQUEMA_POINTING = 2
+
+# Número de processos usados para ler as abas mensais (1 = leitura serial)
+PROCESSOS_INGESTAO = int(os.environ.get('DASHBOARD_PROCESSOS', '1'))
+
+logger = logging.getLogger(__name__)
+
+_NS_PLANILHA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_RELACOES = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
+def impressao_digital(caminho):
+    """Retorna a impressão digital (mtime, tamanho) do arquivo de origem."""
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size
+
+
+def versao_arquivo(caminho):
+    """Impressão digital para compor chaves de cache; None se o arquivo não existir."""
+    try:
+        return impressao_digital(caminho)
+    except FileNotFoundError:
+        return None
+
+
+class VigiaArquivos(threading.Thread):
+    """Thread que observa arquivos e chama os callbacks registrados quando um deles muda."""
+
+    def __init__(self, intervalo=2.0):
+        super().__init__(name='vigia-arquivos', daemon=True)
+        self.intervalo = intervalo
+        self._callbacks = {}
+        self._versoes = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+
+    def registrar(self, caminho, ao_mudar):
+        """Registra ao_mudar() para ser chamado quando o arquivo mudar."""
+        caminho = os.path.abspath(caminho)
+        with self._trava:
+            self._callbacks.setdefault(caminho, []).append(ao_mudar)
+            if caminho not in self._versoes:
+                self._versoes[caminho] = versao_arquivo(caminho)
+
+    def verificar(self):
+        """Compara as impressões digitais e dispara apenas os callbacks dos arquivos alterados."""
+        with self._trava:
+            observados = [(caminho, list(callbacks)) for caminho, callbacks in self._callbacks.items()]
+
+        for caminho, callbacks in observados:
+            versao = versao_arquivo(caminho)
+            if versao == self._versoes.get(caminho):
+                continue
+            self._versoes[caminho] = versao
+            for ao_mudar in callbacks:
+                try:
+                    ao_mudar()
+                except Exception:
+                    logger.exception("Erro ao tratar a alteração de %s", caminho)
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.verificar()
+
+    def parar(self):
+        """Encerra a thread no próximo ciclo."""
+        self._parar.set()
+
+
+def _chave(*partes):
+    """Gera uma chave curta e estável a partir das partes informadas."""
+    return hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()[:16]
+
+
+def _codificar_valor(valor):
+    """[tipo, texto] de um rótulo de coluna ou valor de attrs, para restaurá-lo na leitura do snapshot."""
+    if valor is None:
+        return ['none', '']
+    if isinstance(valor, datetime):
+        return ['datetime', valor.isoformat()]
+    if isinstance(valor, (int, np.integer)) and not isinstance(valor, (bool, np.bool_)):
+        return ['int', str(valor)]
+    if isinstance(valor, (float, np.floating)):
+        return ['float', repr(float(valor))]
+    return ['str', str(valor)]
+
+
+def _decodificar_valor(tipo, texto):
+    """Inverso de _codificar_valor."""
+    if tipo == 'none':
+        return None
+    if tipo == 'datetime':
+        return datetime.fromisoformat(texto)
+    if tipo == 'int':
+        return int(texto)
+    if tipo == 'float':
+        return float(texto)
+    return texto
+
+
+def _tipar_snapshot(df):
+    """Cópia rasa do DataFrame no formato aceito pelo Parquet.
+
+    Os rótulos viram texto (datas e números do cabeçalho ficam guardados em
+    attrs['rotulos'] para a leitura, junto com os attrs do frame) e as colunas
+    com tipos misturados, como o cabeçalho repetido no meio dos números, viram
+    texto; nulos continuam nulos.
+    """
+    rotulos = [_codificar_valor(rotulo) for rotulo in df.columns]
+    tipado = df.set_axis([texto for _, texto in rotulos], axis=1)
+    for posicao, coluna in enumerate(df.columns):
+        valores = df.iloc[:, posicao]
+        if valores.dtype == object and pd.api.types.infer_dtype(valores, skipna=True) in ('mixed', 'mixed-integer'):
+            tipado.isetitem(posicao, valores.where(valores.isna(), valores.astype('str')))
+    metadados = {}
+    if any(tipo != 'str' for tipo, _ in rotulos):
+        metadados['rotulos'] = rotulos
+    if df.attrs:
+        metadados['attrs'] = {chave: _codificar_valor(valor) for chave, valor in df.attrs.items()}
+    tipado.attrs = metadados
+    return tipado
+
+
+def _gravar_snapshot(df, destino):
+    """Grava o DataFrame em Parquet; se o pyarrow ainda recusar o frame, cai para pickle e avisa no log."""
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    try:
+        _tipar_snapshot(df).to_parquet(temporario)
+        os.replace(temporario, destino + '.parquet')
+        return destino + '.parquet'
+    except (ImportError, ValueError, TypeError) as e:
+        logger.warning("Snapshot '%s' gravado em pickle: %s", os.path.basename(destino), e)
+        with open(temporario, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, destino + '.pkl')
+        return destino + '.pkl'
+
+
+def _ler_snapshot(arquivo):
+    """Lê um snapshot gravado por _gravar_snapshot, com os rótulos originais das colunas."""
+    if not arquivo.endswith('.parquet'):
+        with open(arquivo, 'rb') as f:
+            return pickle.load(f)
+    df = pd.read_parquet(arquivo)
+    metadados, df.attrs = df.attrs, {}
+    if metadados.get('rotulos'):
+        df.columns = pd.Index([_decodificar_valor(tipo, texto) for tipo, texto in metadados['rotulos']], dtype=object)
+    for chave, (tipo, texto) in metadados.get('attrs', {}).items():
+        df.attrs[chave] = _decodificar_valor(tipo, texto)
+    return df
+
+
+def _localizar_snapshot(prefixo, versao):
+    """Procura o snapshot da versão atual e remove os de versões antigas."""
+    encontrado = None
+    for nome in os.listdir(SNAPSHOTS_DIR):
+        if not nome.startswith(prefixo + '-') or nome.endswith('.tmp'):
+            continue
+        if nome.startswith(f"{prefixo}-{versao}."):
+            encontrado = os.path.join(SNAPSHOTS_DIR, nome)
+        else:
+            try:
+                os.remove(os.path.join(SNAPSHOTS_DIR, nome))
+            except OSError:
+                pass
+    return encontrado
+
+
+def _buscar_snapshot(caminho, aba, header, usecols, limpar=None):
+    """Retorna (DataFrame ou None, destino) do snapshot da versão atual do arquivo."""
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    prefixo = _chave(caminho, aba, header, usecols, getattr(limpar, '__name__', None))
+    versao = _chave(*impressao_digital(caminho))
+    destino = os.path.join(SNAPSHOTS_DIR, f"{prefixo}-{versao}")
+
+    snapshot = _localizar_snapshot(prefixo, versao)
+    if snapshot is not None:
+        try:
+            return _ler_snapshot(snapshot), destino
+        except Exception:
+            # Snapshot corrompido: descarta e reconstrói a partir do Excel
+            os.remove(snapshot)
+    return None, destino
+
+
+def ler_planilha(caminho, aba=0, header=0, usecols=None, limpar=None):
+    """Lê uma aba de planilha Excel passando por um snapshot em disco.
+
+    O snapshot é identificado por caminho + aba + header (+ colunas) e versionado
+    por mtime + tamanho do arquivo, então só é reconstruído quando a origem muda.
+    Com `limpar` informado, o snapshot guarda o frame já limpo e tipado por ele.
+    """
+    caminho = os.path.abspath(caminho)
+    df, destino = _buscar_snapshot(caminho, aba, header, usecols, limpar)
+    if df is None:
+        df = pd.read_excel(caminho, sheet_name=aba, header=header, usecols=usecols)
+        if limpar is not None:
+            df = limpar(df)
+        _gravar_snapshot(df, destino)
+    return df
+
+
+def listar_abas(caminho):
+    """Lista os nomes das abas lendo apenas o xl/workbook.xml, sem abrir a pasta inteira."""
+    try:
+        with zipfile.ZipFile(caminho) as pacote:
+            raiz = ElementTree.fromstring(pacote.read('xl/workbook.xml'))
+        return [aba.get('name') for aba in raiz.iter(f'{_NS_PLANILHA}sheet')]
+    except (zipfile.BadZipFile, KeyError):
+        # Formatos antigos (.xls) não são zip: deixa o pandas listar
+        with pd.ExcelFile(caminho) as xls:
+            return xls.sheet_names
+
+
+def ler_abas(caminho, abas, header=0, usecols=None, ao_falhar=None, limpar=None):
+    """Gera (aba, DataFrame) para cada aba pedida abrindo a pasta de trabalho uma única vez.
+
+    Abas com snapshot válido não tocam no Excel; a pasta só é aberta na primeira
+    aba que precisar ser lida. Com `limpar` informado, cada aba é limpa antes de
+    ir para o snapshot. Erros de uma aba são repassados para
+    ao_falhar(aba, erro) quando informado, senão são propagados.
+    """
+    caminho = os.path.abspath(caminho)
+    xls = None
+    try:
+        for aba in abas:
+            try:
+                df, destino = _buscar_snapshot(caminho, aba, header, usecols, limpar)
+                if df is None:
+                    if xls is None:
+                        xls = pd.ExcelFile(caminho)
+                    df = xls.parse(aba, header=header, usecols=usecols)
+                    if limpar is not None:
+                        df = limpar(df)
+                    _gravar_snapshot(df, destino)
+            except Exception as e:
+                if ao_falhar is None:
+                    raise
+                ao_falhar(aba, e)
+                continue
+            yield aba, df
+    finally:
+        if xls is not None:
+            xls.close()
+
+
+def _arranjo_tipado(tipo, tamanho):
+    """Arranjo pré-alocado e preenchido com o valor vazio do tipo."""
+    if tipo == 'datetime64[ns]':
+        return np.full(tamanho, np.datetime64('NaT'), dtype=tipo)
+    if np.dtype(tipo).kind == 'f':
+        return np.full(tamanho, np.nan, dtype=tipo)
+    return np.empty(tamanho, dtype=object)
+
+
+def _converter_celula(valor, tipo):
+    """Converte o valor de uma célula para o tipo do arranjo; None quando não couber."""
+    if tipo == 'datetime64[ns]':
+        return np.datetime64(valor, 'ns') if isinstance(valor, datetime) else None
+    if tipo == object:
+        return valor
+    return valor if isinstance(valor, (int, float)) and not isinstance(valor, bool) else None
+
+
+def ler_colunas_planilha(caminho, colunas, tipos=None, aba=None):
+    """Lê apenas as colunas pedidas de uma aba, em streaming, para arranjos tipados.
+
+    A pasta é aberta em modo read_only: o cabeçalho (primeira linha) resolve as
+    posições das colunas e as linhas seguintes são percorridas só até a última
+    coluna necessária, célula a célula, direto para arranjos pré-alocados. A
+    memória e o tempo crescem com as colunas usadas, não com a pasta inteira.
+    tipos mapeia coluna -> dtype ('datetime64[ns]', 'float64', ...; padrão object);
+    valores que não cabem no tipo viram NaN/NaT.
+    """
+    from openpyxl import load_workbook  # importado só quando uma pasta é lida em streaming
+
+    tipos = {coluna: (tipos or {}).get(coluna, object) for coluna in colunas}
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = workbook[aba] if aba is not None else workbook.active
+        cabecalho = list(next(planilha.iter_rows(max_row=1, values_only=True), ()))
+        faltando = [coluna for coluna in colunas if coluna not in cabecalho]
+        if faltando:
+            raise KeyError(f"Colunas não encontradas na planilha: {faltando}")
+        posicoes = [cabecalho.index(coluna) for coluna in colunas]
+
+        # A dimensão declarada na aba dá o número de linhas; se faltar, os arranjos crescem
+        capacidade = max((planilha.max_row or 0) - 1, 1024)
+        arranjos = {coluna: _arranjo_tipado(tipos[coluna], capacidade) for coluna in colunas}
+        total = 0
+        for linha in planilha.iter_rows(min_row=2, max_col=max(posicoes) + 1, values_only=True):
+            if total == capacidade:
+                capacidade *= 2
+                for coluna, arranjo in arranjos.items():
+                    maior = _arranjo_tipado(tipos[coluna], capacidade)
+                    maior[:total] = arranjo
+                    arranjos[coluna] = maior
+            for coluna, posicao in zip(colunas, posicoes):
+                valor = linha[posicao] if posicao < len(linha) else None
+                if valor is not None:
+                    valor = _converter_celula(valor, tipos[coluna])
+                    if valor is not None:
+                        arranjos[coluna][total] = valor
+            total += 1
+    finally:
+        workbook.close()
+    return pd.DataFrame({coluna: arranjo[:total] for coluna, arranjo in arranjos.items()})
+
+
+def abas_mensais(nomes_abas):
+    """Filtra as abas no formato "Mês-Ano" e retorna [(aba, mês, ano)] na ordem da pasta."""
+    abas = []
+    for sheet in nomes_abas:
+        if '-' in sheet:
+            mes_ano = sheet.split('-')
+            if len(mes_ano) == 2:
+                mes, ano = mes_ano[0].strip(), mes_ano[1].strip()
+                if mes in MESES_VALIDOS and ano.isdigit():
+                    abas.append((sheet, mes, int(ano)))
+    return abas
+
+
+def assinaturas_abas(caminho):
+    """Assinatura de conteúdo de cada aba a partir dos CRCs do pacote xlsx.
+
+    Só lê o diretório do zip e os índices da pasta, sem descompactar as planilhas.
+    Textos compartilhados e estilos entram em todas as assinaturas, pois alteram
+    o valor lido de qualquer aba.
+    """
+    with zipfile.ZipFile(caminho) as pacote:
+        raiz = ElementTree.fromstring(pacote.read('xl/workbook.xml'))
+        relacoes = ElementTree.fromstring(pacote.read('xl/_rels/workbook.xml.rels'))
+        crcs = {info.filename: info.CRC for info in pacote.infolist()}
+
+    alvos = {rel.get('Id'): rel.get('Target') for rel in relacoes}
+    comum = (crcs.get('xl/sharedStrings.xml'), crcs.get('xl/styles.xml'))
+    assinaturas = {}
+    for aba in raiz.iter(f'{_NS_PLANILHA}sheet'):
+        alvo = alvos.get(aba.get(f'{_NS_RELACOES}id'), '')
+        xml = alvo.lstrip('/') if alvo.startswith('/') else f'xl/{alvo}'
+        assinaturas[aba.get('name')] = _chave(comum, crcs.get(xml))
+    return assinaturas
+
+
+def _limpar_linhas_pointing(df):
+    """Seleciona as linhas com data da aba de apontamento e converte os tipos."""
+    # Limpar e organizar os dados
+    df_cleaned = df.dropna(how='all').iloc[1:].copy()
+    df_cleaned.columns = NOMES_COLUNAS_POINTING
+
+    df_cleaned['Data'] = pd.to_datetime(df_cleaned['Data'], errors='coerce')
+    df_cleaned.dropna(subset=['Data'], inplace=True)
+
+    # Convertendo as colunas para numérico
+    for coluna in NOMES_COLUNAS_POINTING[1:]:
+        df_cleaned[coluna] = pd.to_numeric(df_cleaned[coluna], errors='coerce').fillna(0).astype(ESQUEMA_POINTING[coluna])
+
+    return df_cleaned
+
+
+def numerar_dias_pointing(df_cleaned, meses=None):
+    """Preenche a coluna "Dia" (contagem que reinicia a cada mês).
+
+    Com meses (períodos mensais) informados, recalcula apenas as linhas desses meses.
+    """
+    periodos = df_cleaned['Data'].dt.to_period("M")
+    if meses is None:
+        df_cleaned[''] = df_cleaned.groupby(periodos).cumcount() + 1
+    else:
+        afetadas = periodos.isin(meses)
+        df_cleaned.loc[afetadas, ''] = df_cleaned[afetadas].groupby(periodos[afetadas]).cumcount() + 1
+    df_cleaned[''] = df_cleaned[''].astype(ESQUEMA_POINTING[''])
+    return df_cleaned
+
+
+def limpar_dados_pointing(df):
+    """Limpa uma aba de apontamento já reduzida às colunas de COLUNAS_POINTING."""
+    return numerar_dias_pointing(_limpar_linhas_pointing(df))
+
+
+def _processar_lote_pointing(arquivo, lote, numerar_dias=True):
+    """Lê e limpa um lote de abas mensais; roda dentro de um processo do pool.
+
+    Os snapshots guardam as abas já limpas, com o esquema tipado do apontamento.
+    """
+    limpar = limpar_dados_pointing if numerar_dias else _limpar_linhas_pointing
+    resultados = []
+    for aba, df in ler_abas(arquivo, lote, header=0, usecols=COLUNAS_POINTING, limpar=limpar,
+                            ao_falhar=lambda aba, e: resultados.append((aba, None, e))):
+        resultados.append((aba, df, None))
+    return resultados
+
+
+def _ler_lotes_em_paralelo(arquivo, abas, processos, numerar_dias=True):
+    """Distribui as abas em lotes contíguos entre os processos e junta os resultados."""
+    tamanho = -(-len(abas) // processos)
+    lotes = [abas[i:i + tamanho] for i in range(0, len(abas), tamanho)]
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=len(lotes)) as pool:
+        for parcial in pool.map(_processar_lote_pointing, [arquivo] * len(lotes), lotes,
+                                [numerar_dias] * len(lotes)):
+            for aba, df, erro in parcial:
+                resultados[aba] = (df, erro)
+    return resultados
+
+
+def _limpar_abas(arquivo, abas, processos, numerar_dias=True):
+    """Limpa as abas pedidas em paralelo quando possível; retorna {aba: (df, erro)}."""
+    if processos > 1 and len(abas) > 1:
+        try:
+            return _ler_lotes_em_paralelo(arquivo, abas, min(processos, len(abas)), numerar_dias)
+        except (OSError, BrokenProcessPool):
+            pass
+    return {aba: (df, erro) for aba, df, erro in _processar_lote_pointing(arquivo, abas, numerar_dias)}
+
+
+def _anexar_linhas_pointing(historico, atual):
+    """Junta a versão nova de uma aba ao histórico já limpo.
+
+    Se o histórico é um prefixo inalterado da aba, só as linhas novas são anexadas
+    e o "Dia" é recalculado apenas nos meses que receberam linhas; caso contrário
+    a aba inteira é renumerada.
+    """
+    colunas = NOMES_COLUNAS_POINTING
+    prefixo = atual.iloc[:len(historico)]
+    if (len(historico) > len(atual)
+            or not prefixo.index.equals(historico.index)
+            or not (prefixo[colunas].to_numpy() == historico[colunas].to_numpy()).all()):
+        return numerar_dias_pointing(atual)
+
+    novas = atual.iloc[len(historico):]
+    if novas.empty:
+        return historico
+    combinado = pd.concat([historico, novas])
+    meses = novas['Data'].dt.to_period("M").unique()
+    return numerar_dias_pointing(combinado, meses)
+
+
+def _carregar_abas_incremental(arquivo, abas, processos):
+    """Atualiza o armazenamento local só com as abas alteradas e devolve {aba: (df, erro)}."""
+    pasta = os.path.join(INCREMENTAL_DIR, _chave(arquivo, VERSAO_ESQUEMA_POINTING))
+    os.makedirs(pasta, exist_ok=True)
+    manifesto_caminho = os.path.join(pasta, 'manifesto.json')
+    try:
+        with open(manifesto_caminho, encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        manifesto = {}
+
+    assinaturas = assinaturas_abas(arquivo)
+    armazenadas = {}
+    for aba in abas:
+        arquivo_aba = manifesto.get(aba, {}).get('arquivo')
+        if arquivo_aba and os.path.exists(os.path.join(pasta, arquivo_aba)):
+            armazenadas[aba] = os.path.join(pasta, arquivo_aba)
+
+    alteradas = [aba for aba in abas
+                 if aba not in armazenadas or manifesto[aba].get('assinatura') != assinaturas.get(aba)]
+    limpas = _limpar_abas(arquivo, alteradas, processos, numerar_dias=False) if alteradas else {}
+
+    resultados = {}
+    for aba in abas:
+        historico = _ler_snapshot(armazenadas[aba]) if aba in armazenadas else None
+        if aba not in limpas:
+            resultados[aba] = (historico, None)
+            continue
+        atual, erro = limpas[aba]
+        if erro is not None:
+            resultados[aba] = (None, erro)
+            continue
+        df_cleaned = _anexar_linhas_pointing(historico, atual) if historico is not None else numerar_dias_pointing(atual)
+        destino = _gravar_snapshot(df_cleaned, os.path.join(pasta, _chave(aba)))
+        manifesto[aba] = {'assinatura': assinaturas.get(aba), 'arquivo': os.path.basename(destino)}
+        resultados[aba] = (df_cleaned, None)
+
+    if alteradas:
+        temporario = f"{manifesto_caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False)
+        os.replace(temporario, manifesto_caminho)
+    return resultados
+
+
+def carregar_abas_pointing(arquivo, ao_falhar=None, processos=None, incremental=False):
+    """Carrega e limpa todas as abas mensais do apontamento.
+
+    Com processos > 1 as abas são limpas em paralelo por um pool de processos,
+    cada um abrindo a pasta uma única vez para o seu lote; se o pool não puder
+    ser usado, cai para a leitura serial. Com incremental=True o histórico já
+    limpo fica num armazenamento local e só as abas alteradas são relidas.
+    O resultado mantém a ordem das abas.
+    """
+    abas = {aba: (mes, ano) for aba, mes, ano in abas_mensais(listar_abas(arquivo))}
+    processos = PROCESSOS_INGESTAO if processos is None else processos
+    arquivo = os.path.abspath(arquivo)
+
+    resultados = None
+    if incremental:
+        try:
+            resultados = _carregar_abas_incremental(arquivo, list(abas), processos)
+        except (zipfile.BadZipFile, KeyError):
+            # Pastas que não são xlsx não têm CRC por aba: leitura completa
+            resultados = None
+    if resultados is None:
+        resultados = _limpar_abas(arquivo, list(abas), processos)
+
+    dados_list = []
+    for aba, (mes, ano) in abas.items():
+        df_cleaned, erro = resultados[aba]
+        if erro is not None:
+            if ao_falhar is None:
+                raise erro
+            ao_falhar(aba, erro)
+            continue
+        df_cleaned['Mês'] = mes
+        df_cleaned['Ano'] = ano
+        dados_list.append(df_cleaned)
+
+    if not dados_list:
+        return None
+    dados = pd.concat(dados_list, ignore_index=True)
+    return dados.astype({'Mês': ESQUEMA_POINTING['Mês'], 'Ano': ESQUEMA_POINTING['Ano']})
@@ -0,0 +1,128 @@
+# Ingestor em segundo plano: observa .database/ e importa as planilhas para o banco.
+#
+# Uso: python ingestor.py [--pasta .database] [--intervalo 2] [--uma-vez]
+#
+# Deve ser iniciado junto com o servidor (streamlit run): é ele que faz o
+# aquecimento dos dados, então o primeiro acesso depois de um deploy já encontra
+# as planilhas lidas.
+#
+# Roda fora do Streamlit. A cada planilha alterada relê só o que mudou (snapshots,
+# histórico incremental e série de estoque), atualiza o banco operacional, grava o
+# snapshot de cada conjunto do registro e publica a versão de cada conjunto, pelo
+# nome, em .cache/versao.json. Enquanto o ingestor estiver ativo, as páginas apenas
+# leem o banco e esses snapshots e nunca esperam pela leitura do Excel.
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+from ingestao import VigiaArquivos, versao_arquivo
+from registro import DADOS_DIR, REGISTRO, VERSAO_DADOS_PATH, ler_versoes
+
+logger = logging.getLogger('ingestor')
+
+# Opções extras por conjunto: abas do apontamento que falharem são só avisadas
+OPCOES_IMPORTACAO = {
+    'pointing': {'ao_falhar': lambda aba, e: logger.error("Erro ao carregar a aba %s: %s", aba, e)},
+}
+
+# versao.json é gravado pela thread do batimento e pelo laço das importações
+_trava_versoes = threading.Lock()
+
+
+def conjuntos_por_planilha(pasta=DADOS_DIR):
+    """Agrupa por planilha da pasta todos os conjuntos declarados no registro de dados."""
+    conjuntos = {}
+    for conjunto in REGISTRO.values():
+        caminho = os.path.abspath(os.path.join(pasta, os.path.basename(conjunto.arquivo)))
+        conjuntos.setdefault(caminho, []).append(conjunto)
+    return conjuntos
+
+
+def _gravar_versoes(versoes, batimento=None):
+    """Grava versao.json de forma atômica, atualizando o batimento se informado."""
+    os.makedirs(os.path.dirname(VERSAO_DADOS_PATH), exist_ok=True)
+    temporario = f"{VERSAO_DADOS_PATH}.{os.getpid()}.tmp"
+    with _trava_versoes:
+        if batimento is not None:
+            versoes['batimento'] = batimento
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(versoes, f, ensure_ascii=False)
+        os.replace(temporario, VERSAO_DADOS_PATH)
+
+
+def _bater(versoes, intervalo, parar):
+    """Grava o batimento a cada `intervalo` segundos até `parar`, mesmo no meio de uma importação.
+
+    Sem isso, uma importação mais longa que LIMITE_BATIMENTO faria as páginas
+    considerarem o ingestor parado e lerem o Excel enquanto ele grava o banco.
+    """
+    while not parar.wait(intervalo):
+        _gravar_versoes(versoes, time.time())
+
+
+def ingerir(caminho, conjuntos, versoes):
+    """Publica os conjuntos de uma planilha e registra, por nome, as versões publicadas em `versoes`."""
+    if versao_arquivo(caminho) is None:
+        logger.error("Arquivo '%s' não encontrado.", caminho)
+        return False
+    inicio = time.perf_counter()
+    sucesso = True
+    for conjunto in conjuntos:
+        try:
+            versao = conjunto.publicar(caminho, **OPCOES_IMPORTACAO.get(conjunto.nome, {}))
+        except Exception as e:
+            logger.error("Erro ao importar '%s' de '%s': %s", conjunto.nome, caminho, e)
+            sucesso = False
+            continue
+        with _trava_versoes:
+            versoes.setdefault('conjuntos', {})[conjunto.nome] = list(versao)
+    if not sucesso:
+        return False
+    logger.info("'%s' importado em %.2fs", os.path.basename(caminho), time.perf_counter() - inicio)
+    return True
+
+
+def executar(pasta=DADOS_DIR, intervalo=2.0, uma_vez=False):
+    """Importa todas as planilhas e, a menos que uma_vez, segue observando a pasta."""
+    # Até a primeira carga terminar, as páginas seguem com o que foi publicado antes
+    versoes = {'conjuntos': dict(ler_versoes().get('conjuntos', {}))}
+    planilhas = conjuntos_por_planilha(pasta)
+
+    # Registrado antes da primeira carga, o vigia também pega alterações feitas
+    # durante ela; roda no próprio laço principal, uma importação por vez
+    vigia = VigiaArquivos(intervalo=intervalo)
+    for caminho, conjuntos in planilhas.items():
+        vigia.registrar(caminho, lambda caminho=caminho, conjuntos=conjuntos: ingerir(caminho, conjuntos, versoes))
+
+    parar = threading.Event()
+    if not uma_vez:
+        _gravar_versoes(versoes, time.time())
+        threading.Thread(target=_bater, args=(versoes, intervalo, parar), name='batimento', daemon=True).start()
+
+    try:
+        for caminho, conjuntos in planilhas.items():
+            ingerir(caminho, conjuntos, versoes)
+        _gravar_versoes(versoes, time.time())
+        if uma_vez:
+            return
+        while True:
+            vigia.verificar()
+            _gravar_versoes(versoes)
+            time.sleep(intervalo)
+    except KeyboardInterrupt:
+        logger.info("Ingestor encerrado.")
+    finally:
+        parar.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa as planilhas de .database/ para o banco operacional.")
+    parser.add_argument('--pasta', default=DADOS_DIR, help="pasta com as planilhas observadas")
+    parser.add_argument('--intervalo', type=float, default=2.0, help="segundos entre verificações")
+    parser.add_argument('--uma-vez', action='store_true', help="importa uma vez e encerra")
+    argumentos = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    executar(argumentos.pasta, argumentos.intervalo, argumentos.uma_vez)
@@ -0,0 +1,56 @@
+import logging
+import os
+import threading
+import time
+
+from registro import REGISTRO
+
+logger = logging.getLogger(__name__)
+
+# Orçamento (s) para a primeira renderização de cada sessão; acima dele o tempo
+# medido é avisado no log do servidor
+ORCAMENTO_PRIMEIRA_RENDERIZACAO = float(os.environ.get('DASHBOARD_ORCAMENTO_RENDER', '2.0'))
+
+def aquecer(obter=(), sincronizar=()):
+    """Carrega conjuntos do registro numa thread em segundo plano.
+
+    Roda na primeira execução de script do processo (st.cache_resource), não na
+    subida do servidor: a leitura pesada das planilhas é feita antes pelo ingestor
+    (ingestor.py), iniciado junto com o servidor, e aqui só os snapshots e tabelas
+    publicados por ele são trazidos para a memória. Sem o ingestor, a primeira
+    sessão ainda paga a leitura do Excel.
+
+    `obter` lista os conjuntos carregados em memória e `sincronizar` os que só
+    precisam estar em dia no banco operacional. Uma página que pedir o mesmo
+    conjunto durante o aquecimento espera a carga em andamento em vez de repeti-la;
+    se o aquecimento falhar, a página tenta de novo e mostra o erro.
+    """
+    def executar():
+        for nome in sincronizar:
+            try:
+                REGISTRO[nome].sincronizar()
+            except Exception:
+                logger.exception("Erro ao aquecer '%s' no banco", nome)
+        for nome in obter:
+            try:
+                REGISTRO[nome].obter()
+            except Exception:
+                logger.exception("Erro ao aquecer '%s'", nome)
+
+    thread = threading.Thread(target=executar, name='aquecimento-dados', daemon=True)
+    thread.start()
+    return thread
+
+
+def medir_primeira_renderizacao(estado, inicio):
+    """Registra em `estado` (session_state) o tempo da primeira renderização da sessão.
+
+    Só a primeira execução de cada sessão é medida; passando do orçamento, o tempo
+    vai para o log. Retorna o tempo medido (s).
+    """
+    if 'tempo_primeira_renderizacao' not in estado:
+        decorrido = time.perf_counter() - inicio
+        estado['tempo_primeira_renderizacao'] = decorrido
+        if decorrido > ORCAMENTO_PRIMEIRA_RENDERIZACAO:
+            logger.warning("Primeira renderização em %.2fs (orçamento: %.2fs)", decorrido, ORCAMENTO_PRIMEIRA_RENDERIZACAO)
+    return estado['tempo_primeira_renderizacao']
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+import os
+import threading
+import types
+
+import numpy as np
+import pandas as pd
+
+# Orçamento de memória (MB) dos dados mantidos pelo processo; acima dele os
+# conjuntos usados há mais tempo são descartados
+ORCAMENTO_MEMORIA = int(os.environ.get('DASHBOARD_ORCAMENTO_MEMORIA_MB', '1024')) * 1024 * 1024
+
+
+def tamanho_em_bytes(valor):
+    """Memória ocupada por um valor guardado no cache (DataFrames, arrays e tuplas/dicts deles)."""
+    if isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum()) if isinstance(uso, pd.Series) else int(uso)
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (tuple, list)):
+        return sum(tamanho_em_bytes(item) for item in valor)
+    if isinstance(valor, dict):
+        return sum(tamanho_em_bytes(item) for item in valor.values())
+    return 0
+
+
+def _congelar(valor):
+    """Marca como somente leitura os arrays NumPy do valor que vai para o cache."""
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (tuple, list)):
+        for item in valor:
+            _congelar(item)
+    elif isinstance(valor, dict):
+        for item in valor.values():
+            _congelar(item)
+    return valor
+
+
+# Copy-on-write é sempre ligado a partir do pandas 3.0; no 2.x depende da opção
+_PANDAS_3 = int(pd.__version__.split('.')[0]) >= 3
+
+
+def _copia_na_escrita():
+    return _PANDAS_3 or pd.options.mode.copy_on_write is True
+
+
+def _visao(valor):
+    """Visão do valor guardado, sem copiar dados.
+
+    DataFrames e Series saem como cópias rasas: com o copy-on-write do pandas,
+    alterar a visão copia só a coluna alterada e nunca chega ao valor guardado.
+    Sem copy-on-write (pandas 2.x sem a opção) a cópia é completa, para que uma
+    página não altere o valor compartilhado. Arrays já estão congelados e dicts
+    saem como mapeamentos somente leitura.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy(deep=not _copia_na_escrita())
+    if isinstance(valor, tuple):
+        return tuple(_visao(item) for item in valor)
+    if isinstance(valor, dict):
+        return types.MappingProxyType(valor)
+    return valor
+
+
+class CacheDados:
+    """Cache de dados do processo, compartilhado por todas as sessões.
+
+    Guarda uma versão por nome: carregar uma versão nova de um nome descarta a
+    anterior. Quando o total passa do orçamento, os nomes usados há mais tempo
+    saem primeiro (LRU); o último carregado fica mesmo que sozinho passe do
+    orçamento. Acertos, faltas, descartes e bytes guardados ficam em estatisticas().
+    """
+
+    def __init__(self, orcamento=ORCAMENTO_MEMORIA):
+        self.orcamento = orcamento
+        self._itens = OrderedDict()  # nome -> (versão, valor, bytes)
+        self._trava = threading.Lock()
+        self._travas_carga = {}
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+        self.bytes = 0
+
+    def _trava_carga(self, nome):
+        with self._trava:
+            return self._travas_carga.setdefault(nome, threading.Lock())
+
+    def _buscar(self, nome, versao):
+        with self._trava:
+            item = self._itens.get(nome)
+            if item is None or item[0] != versao:
+                return None
+            self._itens.move_to_end(nome)
+            self.acertos += 1
+            return item
+
+    def obter(self, nome, versao, carregar):
+        """Valor de `nome` na `versao`, como visão somente leitura; carregar() só roda na falta.
+
+        Sessões que pedem o mesmo nome durante uma carga esperam por ela em vez de repeti-la.
+        """
+        item = self._buscar(nome, versao)
+        if item is None:
+            with self._trava_carga(nome):
+                item = self._buscar(nome, versao)
+                if item is None:
+                    with self._trava:
+                        self.faltas += 1
+                    valor = carregar()
+                    # Carga sem resultado não é guardada: a próxima chamada tenta de novo
+                    if valor is None:
+                        return None
+                    item = self._guardar(nome, versao, valor)
+        return _visao(item[1])
+
+    def _guardar(self, nome, versao, valor):
+        item = (versao, _congelar(valor), tamanho_em_bytes(valor))
+        with self._trava:
+            anterior = self._itens.pop(nome, None)
+            if anterior is not None:
+                self.bytes -= anterior[2]
+            self._itens[nome] = item
+            self.bytes += item[2]
+            while self.bytes > self.orcamento and len(self._itens) > 1:
+                _, (_, _, tamanho) = self._itens.popitem(last=False)
+                self.bytes -= tamanho
+                self.descartes += 1
+        return item
+
+    def estatisticas(self):
+        """Contadores do cache: acertos, faltas, descartes, bytes, itens e orçamento."""
+        with self._trava:
+            return {'acertos': self.acertos, 'faltas': self.faltas, 'descartes': self.descartes,
+                    'bytes': self.bytes, 'itens': len(self._itens), 'orcamento': self.orcamento}
+
+
+CACHE = CacheDados()
+
+
+def em_cache(nome, versao, carregar):
+    """Atalho para CACHE.obter: dados de `nome` na `versao`, carregados uma vez por processo."""
+    return CACHE.obter(nome, versao, carregar)
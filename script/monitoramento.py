@@ -0,0 +1,261 @@
+import csv
+from datetime import datetime
+import io
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from ingestao import ler_planilha, versao_arquivo
+
+logger = logging.getLogger(__name__)
+
+# Leituras guardadas por máquina; ao encher, as mais antigas são sobrescritas
+CAPACIDADE_LEITURAS = 256
+# Segundos entre duas consultas às fontes de status
+INTERVALO_MONITORAMENTO = float(os.environ.get('DASHBOARD_INTERVALO_MONITORAMENTO', '5'))
+# Segundos entre duas atualizações do status na tela, no modo ao vivo
+INTERVALO_AO_VIVO = float(os.environ.get('DASHBOARD_INTERVALO_AO_VIVO', '5'))
+# Endpoint CSV opcional com o status das máquinas (maquina,status,valor)
+MONITORAMENTO_URL = os.environ.get('DASHBOARD_MONITORAMENTO_URL')
+TEMPO_LIMITE_URL = 5
+
+# Estados conhecidos; o código de cada um é a posição na lista
+ESTADOS_MAQUINA = ['Desconhecido', 'Produzindo', 'Parada', 'Setup', 'Manutenção']
+_CODIGOS_ESTADO = {estado.upper(): codigo for codigo, estado in enumerate(ESTADOS_MAQUINA)}
+
+# Layout do status das máquinas no Programa de Extrusão. Por padrão a aba e o
+# cabeçalho são os mesmos da leitura do programa (quinta linha), que assim
+# reaproveita o snapshot dela. Os nomes das colunas não têm padrão: sem
+# DASHBOARD_COLUNA_MAQUINA e DASHBOARD_COLUNA_STATUS a planilha não é consultada
+ABA_MONITORAMENTO = os.environ.get('DASHBOARD_MONITORAMENTO_ABA', 'ProgramaExtrusão')
+LINHA_CABECALHO_MONITORAMENTO = int(os.environ.get('DASHBOARD_MONITORAMENTO_CABECALHO', '4'))
+COLUNA_MAQUINA = os.environ.get('DASHBOARD_COLUNA_MAQUINA')
+COLUNA_STATUS = os.environ.get('DASHBOARD_COLUNA_STATUS')
+# Opcional: coluna com o valor numérico da leitura (produção, velocidade...)
+COLUNA_VALOR = os.environ.get('DASHBOARD_COLUNA_VALOR')
+
+
+def codigo_estado(texto):
+    """Código numérico do estado informado pela fonte (0 para estados desconhecidos)."""
+    return _CODIGOS_ESTADO.get(str(texto).strip().upper(), 0)
+
+
+def _datas_locais(instantes):
+    """Converte instantes (segundos desde a época) em datas no fuso horário do servidor."""
+    fuso = datetime.now().astimezone().tzinfo
+    return pd.to_datetime(instantes, unit='s', utc=True).tz_convert(fuso).tz_localize(None)
+
+
+def _numero(valor):
+    """Valor numérico da leitura, ou NaN se a fonte não informar um número."""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class BufferCircular:
+    """Últimas leituras de uma máquina em arrays NumPy de tamanho fixo.
+
+    Registrar e consultar a última leitura custam O(1), sem alocar memória nova;
+    o histórico completo só é montado quando pedido.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_LEITURAS):
+        self.capacidade = capacidade
+        self.instantes = np.full(capacidade, np.nan)
+        self.estados = np.zeros(capacidade, dtype='int8')
+        self.valores = np.full(capacidade, np.nan)
+        self._proxima = 0
+        self._total = 0
+
+    def __len__(self):
+        return min(self._total, self.capacidade)
+
+    def registrar(self, instante, estado, valor):
+        """Grava uma leitura na próxima posição, sobrescrevendo a mais antiga se estiver cheio."""
+        posicao = self._proxima
+        self.instantes[posicao] = instante
+        self.estados[posicao] = estado
+        self.valores[posicao] = valor
+        self._proxima = (posicao + 1) % self.capacidade
+        self._total += 1
+
+    def ultima(self):
+        """(instante, código do estado, valor) da leitura mais recente, ou None se vazio."""
+        if not self._total:
+            return None
+        posicao = (self._proxima - 1) % self.capacidade
+        return float(self.instantes[posicao]), int(self.estados[posicao]), float(self.valores[posicao])
+
+    def historico(self):
+        """Leituras guardadas, da mais antiga para a mais recente."""
+        posicoes = np.arange(self._proxima - len(self), self._proxima) % self.capacidade
+        return pd.DataFrame({
+            'Instante': _datas_locais(self.instantes[posicoes]),
+            'Estado': pd.Categorical.from_codes(self.estados[posicoes], ESTADOS_MAQUINA),
+            'Valor': self.valores[posicoes],
+        })
+
+
+class FontePlanilha:
+    """Status das máquinas lido do Programa de Extrusão.
+
+    A planilha só é relida quando muda; sem mudança, a consulta não gera leituras.
+    As colunas de máquina e status são obrigatórias; a de valor pode ficar vazia.
+    """
+
+    nome = 'planilha'
+
+    def __init__(self, caminho, aba=ABA_MONITORAMENTO, header=LINHA_CABECALHO_MONITORAMENTO,
+                 coluna_maquina=COLUNA_MAQUINA, coluna_status=COLUNA_STATUS, coluna_valor=COLUNA_VALOR):
+        self.caminho = caminho
+        self.aba = aba
+        self.header = header
+        self.coluna_maquina = coluna_maquina
+        self.coluna_status = coluna_status
+        self.coluna_valor = coluna_valor
+        self._versao = None
+
+    def ler(self):
+        """Leituras (máquina, estado, valor) da versão atual da planilha, se ela mudou."""
+        versao = versao_arquivo(self.caminho)
+        if versao is None or versao == self._versao:
+            return []
+        # Guardada antes da leitura: uma planilha sem as colunas gera um único erro por versão
+        self._versao = versao
+        dados = ler_planilha(self.caminho, self.aba, self.header)
+        faltando = [coluna for coluna in (self.coluna_maquina, self.coluna_status) if coluna not in dados.columns]
+        if faltando:
+            raise ValueError(f"Colunas {faltando} não encontradas na aba {self.aba}.")
+        dados = dados.dropna(subset=[self.coluna_maquina])
+        valores = dados[self.coluna_valor] if self.coluna_valor and self.coluna_valor in dados.columns else [np.nan] * len(dados)
+        return list(zip(dados[self.coluna_maquina].astype('str'), dados[self.coluna_status], valores))
+
+
+class FonteCSV:
+    """Status das máquinas num CSV (maquina,status,valor), em arquivo local ou endereço HTTP."""
+
+    nome = 'csv'
+
+    def __init__(self, endereco, tempo_limite=TEMPO_LIMITE_URL):
+        self.endereco = endereco
+        self.tempo_limite = tempo_limite
+
+    def ler(self):
+        """Leituras (máquina, estado, valor) publicadas agora pelo endereço."""
+        if self.endereco.startswith(('http://', 'https://')):
+            with urllib.request.urlopen(self.endereco, timeout=self.tempo_limite) as resposta:
+                texto = resposta.read().decode('utf-8')
+        else:
+            with open(self.endereco, encoding='utf-8') as f:
+                texto = f.read()
+        return [(linha['maquina'], linha.get('status'), linha.get('valor'))
+                for linha in csv.DictReader(io.StringIO(texto)) if linha.get('maquina')]
+
+
+def fontes_padrao(caminho_programa):
+    """Fontes configuradas: o Programa de Extrusão e o endpoint CSV, cada um se configurado."""
+    fontes = []
+    if COLUNA_MAQUINA and COLUNA_STATUS:
+        fontes.append(FontePlanilha(caminho_programa))
+    else:
+        logger.info("Status pela planilha desligado: defina DASHBOARD_COLUNA_MAQUINA e DASHBOARD_COLUNA_STATUS.")
+    if MONITORAMENTO_URL:
+        fontes.append(FonteCSV(MONITORAMENTO_URL))
+    return fontes
+
+
+class Monitor(threading.Thread):
+    """Thread que consulta as fontes de status e guarda as leituras num buffer por máquina.
+
+    As páginas leem só o buffer (estado_atual), sem tocar nas planilhas ou na rede.
+    Uma fonte que falha é avisada no log e não impede as demais.
+    """
+
+    def __init__(self, fontes, intervalo=INTERVALO_MONITORAMENTO, capacidade=CAPACIDADE_LEITURAS):
+        super().__init__(name='monitoramento-maquinas', daemon=True)
+        self.fontes = list(fontes)
+        self.intervalo = intervalo
+        self.capacidade = capacidade
+        self._buffers = {}
+        self._falhas = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._instantaneo = self._montar_estado()
+
+    def registrar(self, maquina, estado, valor, instante=None):
+        """Grava uma leitura no buffer da máquina (e limpa uma falha anterior dela)."""
+        instante = time.time() if instante is None else instante
+        with self._trava:
+            buffer = self._buffers.get(maquina)
+            if buffer is None:
+                buffer = self._buffers[maquina] = BufferCircular(self.capacidade)
+            buffer.registrar(instante, codigo_estado(estado), _numero(valor))
+            self._falhas.pop(maquina, None)
+
+    def marcar_falha(self, maquina, erro):
+        """Marca a máquina como sem resposta; a última leitura boa continua exibida."""
+        with self._trava:
+            self._falhas[maquina] = str(erro)
+
+    def coletar(self):
+        """Consulta cada fonte uma vez, registra as leituras recebidas e publica o estado."""
+        for fonte in self.fontes:
+            try:
+                leituras = fonte.ler()
+            except Exception as e:
+                logger.error("Erro ao consultar a fonte de monitoramento '%s': %s", fonte.nome, e)
+                continue
+            instante = time.time()
+            for maquina, estado, valor in leituras:
+                self.registrar(maquina, estado, valor, instante)
+        self.publicar()
+
+    def _montar_estado(self):
+        """Tabela com a última leitura e a situação de cada máquina."""
+        with self._trava:
+            maquinas = sorted(set(self._buffers) | set(self._falhas))
+            ultimas = [self._buffers[maquina].ultima() if maquina in self._buffers else (np.nan, 0, np.nan)
+                       for maquina in maquinas]
+            situacoes = [f"Sem resposta ({self._falhas[maquina]})" if maquina in self._falhas else "OK"
+                         for maquina in maquinas]
+        return pd.DataFrame({
+            'Máquina': pd.Series(maquinas, dtype='str'),
+            'Estado': pd.Categorical.from_codes([ultima[1] for ultima in ultimas], ESTADOS_MAQUINA),
+            'Valor': np.array([ultima[2] for ultima in ultimas], dtype='float64'),
+            'Atualizado em': _datas_locais(np.array([ultima[0] for ultima in ultimas], dtype='float64')),
+            'Situação': pd.Series(situacoes, dtype='str'),
+        })
+
+    def publicar(self):
+        """Monta e publica um novo retrato do estado das máquinas."""
+        self._instantaneo = self._montar_estado()
+
+    def estado_atual(self):
+        """Último retrato publicado (Máquina, Estado, Valor, Atualizado em, Situação).
+
+        Só lê uma referência, sem trava e sem montar nada: pode ser chamado a cada
+        rerun. O retrato é compartilhado entre sessões e não deve ser alterado.
+        """
+        return self._instantaneo
+
+    def historico(self, maquina):
+        """Leituras guardadas de uma máquina (vazio se ela nunca foi lida)."""
+        with self._trava:
+            buffer = self._buffers.get(maquina)
+            return buffer.historico() if buffer is not None else BufferCircular(1).historico()
+
+    def run(self):
+        self.coletar()
+        while not self._parar.wait(self.intervalo):
+            self.coletar()
+
+    def parar(self):
+        """Encerra a thread no próximo ciclo."""
+        self._parar.set()
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+
+from banco import importar_demanda, importar_estoque, importar_pointing
+from estoque import carregar_estoque_atual
+from ingestao import (BASE_DIR, _chave, _gravar_snapshot, _ler_snapshot, carregar_abas_pointing, ler_colunas_planilha,
+                      ler_planilha, versao_arquivo)
+from memoria import CACHE
+
+# Caminhos das planilhas, definidos uma única vez para todas as páginas
+DADOS_DIR = os.path.join(BASE_DIR, '.database')
+DADOS_POINTING_PATH = os.path.join(DADOS_DIR, 'ACOMPANHAMENTO DE PRODUÇÃO ATUAL-.xlsx')  # Apontamento
+DADOS_PRODUCAO_PATH = os.path.join(DADOS_DIR, 'DATABASE.xlsx')  # Programa de Extrusão
+DADOS_ESTOQUE_PATH = os.path.join(DADOS_DIR, 'Novembro-2024 - Copia.xlsx')  # Almoxarifado
+
+# Colunas lidas da planilha de demanda e o tipo de cada uma
+COLUNAS_DEMAND = ['Data', 'Produção Cobre Realizado', 'Produção Alumínio Realizado']
+TIPOS_COLUNAS_DEMAND = {'Data': 'datetime64[ns]', 'Produção Cobre Realizado': 'float64', 'Produção Alumínio Realizado': 'float64'}
+
+# Versões publicadas pelo ingestor em segundo plano (ingestor.py), por conjunto,
+# e os snapshots de cada conjunto na versão publicada
+VERSAO_DADOS_PATH = os.path.join(BASE_DIR, '.cache', 'versao.json')
+PUBLICADOS_DIR = os.path.join(BASE_DIR, '.cache', 'conjuntos')
+# Sem batimento por esse tempo (s), o ingestor é considerado parado e as
+# páginas voltam a importar as planilhas por conta própria
+LIMITE_BATIMENTO = 60
+
+
+def ler_versoes():
+    """Conteúdo de versao.json ({} se o ingestor nunca publicou)."""
+    try:
+        with open(VERSAO_DADOS_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def versao_publicada(nome):
+    """Versão do conjunto publicada pelo ingestor, ou None se ele não estiver ativo.
+
+    A chave é o nome do conjunto, e não o caminho da planilha: o ingestor pode
+    observar outra pasta (--pasta) sem que as páginas deixem de reconhecer o que
+    ele publicou.
+    """
+    versoes = ler_versoes()
+    if time.time() - versoes.get('batimento', 0) > LIMITE_BATIMENTO:
+        return None
+    versao = versoes.get('conjuntos', {}).get(nome)
+    return tuple(versao) if versao is not None else None
+
+
+def _publicado(nome, versao):
+    """Caminho (sem extensão) do snapshot do conjunto na versão publicada."""
+    return os.path.join(PUBLICADOS_DIR, f"{nome}-{_chave(*versao)}")
+
+
+class Conjunto:
+    """Conjunto de dados declarado no registro: planilha de origem, carga e importação no banco.
+
+    Nada é lido na importação do módulo. Com o ingestor ativo, as páginas só leem
+    o que ele publicou: o snapshot do conjunto (obter) e as tabelas do banco
+    (sincronizar não faz nada). Sem ele, a carga roda na primeira vez que uma
+    página pede o conjunto. Em ambos os casos o resultado fica no cache de dados
+    do processo (memoria.py), compartilhado por todas as sessões até a versão
+    mudar ou o orçamento de memória exigir o descarte; cada página recebe uma
+    visão sem cópia, então colunas novas criadas por ela não vazam para as outras.
+    """
+
+    def __init__(self, nome, arquivo, carregar=None, importar=None):
+        self.nome = nome
+        self.arquivo = arquivo
+        self.carregar = carregar
+        self.importar = importar
+        self._trava = threading.Lock()
+        self._importado = None
+
+    def versao(self):
+        """Impressão digital atual da planilha de origem (None se ela não existir)."""
+        return versao_arquivo(self.arquivo)
+
+    def versao_servida(self):
+        """Versão dos dados que obter entrega agora: a publicada pelo ingestor ou, sem ele, a da planilha.
+
+        É essa, e não versao(), que deve entrar nas chaves de cache derivadas dos
+        dados: com o ingestor ativo a planilha pode mudar antes de ele publicar.
+        """
+        publicada = versao_publicada(self.nome)
+        return publicada if publicada is not None else self.versao()
+
+    def servir(self, **opcoes):
+        """(versão servida, dados), lidos juntos para que a versão descreva exatamente os dados."""
+        publicada = versao_publicada(self.nome)
+        if publicada is not None:
+            return publicada, CACHE.obter(self.nome, publicada, lambda: self._ler_publicado(publicada, **opcoes))
+        versao = self.versao()
+        return versao, CACHE.obter(self.nome, versao, lambda: self.carregar(self.arquivo, **opcoes))
+
+    def obter(self, **opcoes):
+        """Retorna os dados do conjunto, carregando-os só se a versão mudou desde a última carga."""
+        return self.servir(**opcoes)[1]
+
+    def _ler_publicado(self, versao, **opcoes):
+        """Snapshot publicado pelo ingestor; se ele sumiu, carrega da planilha."""
+        destino = _publicado(self.nome, versao)
+        for arquivo in (destino + '.parquet', destino + '.pkl'):
+            if os.path.exists(arquivo):
+                return _ler_snapshot(arquivo)
+        return self.carregar(self.arquivo, **opcoes)
+
+    def publicar(self, arquivo, **opcoes):
+        """Roda no ingestor: importa a planilha no banco e grava o snapshot do conjunto.
+
+        Retorna a versão publicada. Snapshots de versões anteriores são removidos.
+        """
+        versao = versao_arquivo(arquivo)
+        if versao is None:
+            raise FileNotFoundError(f"Arquivo '{arquivo}' não encontrado.")
+        if self.importar is not None:
+            self.importar(arquivo, **opcoes)
+        if self.carregar is not None:
+            dados = self.carregar(arquivo, **opcoes)
+            os.makedirs(PUBLICADOS_DIR, exist_ok=True)
+            destino = _publicado(self.nome, versao)
+            if dados is not None:
+                _gravar_snapshot(dados, destino)
+            for nome in os.listdir(PUBLICADOS_DIR):
+                if nome.startswith(f"{self.nome}-") and not nome.startswith(os.path.basename(destino) + '.'):
+                    try:
+                        os.remove(os.path.join(PUBLICADOS_DIR, nome))
+                    except OSError:
+                        pass
+        return versao
+
+    def sincronizar(self, **opcoes):
+        """Deixa o banco operacional em dia com a planilha, uma vez por versão do arquivo.
+
+        Com o ingestor ativo o banco já está atualizado e nada é feito aqui.
+        """
+        if self.importar is None or versao_publicada(self.nome) is not None:
+            return
+        versao = self.versao()
+        with self._trava:
+            if self._importado != versao:
+                self.importar(self.arquivo, **opcoes)
+                self._importado = versao
+
+
+def _carregar_pointing(arquivo, ao_falhar=None):
+    """Apontamento limpo de todas as abas mensais, pelo histórico incremental."""
+    return carregar_abas_pointing(arquivo, ao_falhar=ao_falhar, incremental=True)
+
+
+def _carregar_programa(arquivo):
+    """Aba ProgramaExtrusão com o cabeçalho na quinta linha."""
+    return ler_planilha(arquivo, "ProgramaExtrusão", 4)
+
+
+def _carregar_demand(arquivo):
+    """Colunas de produção realizada da planilha de demanda, em streaming."""
+    return ler_colunas_planilha(arquivo, COLUNAS_DEMAND, tipos=TIPOS_COLUNAS_DEMAND)
+
+
+REGISTRO = {
+    conjunto.nome: conjunto
+    for conjunto in (
+        Conjunto('pointing', DADOS_POINTING_PATH, carregar=_carregar_pointing, importar=importar_pointing),
+        Conjunto('programa', DADOS_PRODUCAO_PATH, carregar=_carregar_programa, importar=importar_demanda),
+        Conjunto('estoque', DADOS_ESTOQUE_PATH, carregar=carregar_estoque_atual, importar=importar_estoque),
+        Conjunto('demand', DADOS_PRODUCAO_PATH, carregar=_carregar_demand),
+    )
+}
+
+
+def obter(nome, **opcoes):
+    """Dados do conjunto `nome`, carregados sob demanda e compartilhados entre sessões."""
+    return REGISTRO[nome].obter(**opcoes)
+
+
+def sincronizar(nome, **opcoes):
+    """Garante que o banco operacional reflete a versão atual da planilha do conjunto."""
+    REGISTRO[nome].sincronizar(**opcoes)
+
+
+def servir(nome, **opcoes):
+    """(versão, dados) do conjunto `nome`: a versão é a dos dados entregues, para chaves de cache."""
+    return REGISTRO[nome].servir(**opcoes)
+
+
+def versao_servida(nome):
+    """Versão dos dados que obter(nome) entrega agora (publicada pelo ingestor ou da planilha)."""
+    return REGISTRO[nome].versao_servida()
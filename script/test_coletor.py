@@ -0,0 +1,154 @@
+"""Testes do Coletor contra um servidor HTTP local de mentira.
+
+Rodar a partir de script/: python -m unittest test_coletor (ou pytest test_coletor.py).
+"""
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from coletor import Coletor
+from monitoramento import Monitor
+
+STATUS_PRODUZINDO = json.dumps({'status': 'Produzindo', 'valor': 10.5}).encode()
+
+
+class _Maquinas(BaseHTTPRequestHandler):
+    """Páginas de status de mentira; cada caminho simula um comportamento da máquina."""
+
+    protocol_version = 'HTTP/1.1'
+    conexoes = set()
+
+    def do_GET(self):
+        type(self).conexoes.add(self.client_address)
+        if self.path == '/lenta':
+            time.sleep(1)
+        if self.path == '/erro':
+            self._responder(500, b'')
+        elif self.path == '/partes':
+            # Corpo em chunked transfer encoding, partido no meio do JSON
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for parte in (STATUS_PRODUZINDO[:7], STATUS_PRODUZINDO[7:]):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(parte), parte))
+            self.wfile.write(b'0\r\n\r\n')
+        elif self.path == '/sem-tamanho':
+            # Sem Content-Length: o corpo vai até o servidor fechar a conexão
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(STATUS_PRODUZINDO)
+            self.close_connection = True
+        elif self.path == '/fecha-ociosa':
+            # Responde como keep-alive mas fecha a conexão logo depois
+            self._responder(200, STATUS_PRODUZINDO)
+            self.close_connection = True
+        else:
+            self._responder(200, STATUS_PRODUZINDO)
+
+    def _responder(self, status, corpo):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # O coletor desiste da máquina lenta e fecha a conexão antes da resposta
+        pass
+
+
+class TestColetor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = _Servidor(('127.0.0.1', 0), _Maquinas)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.servidor.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        _Maquinas.conexoes.clear()
+
+    def coletar(self, maquinas, ciclos=1, monitor=None, **opcoes):
+        """Monitor depois de `ciclos` coletas e o número de respostas de cada ciclo."""
+        monitor = Monitor([]) if monitor is None else monitor
+        coletor = Coletor(maquinas, monitor, **opcoes)
+
+        async def executar():
+            try:
+                return [await coletor.coletar() for _ in range(ciclos)]
+            finally:
+                coletor._conexoes.fechar()
+                # Deixa os transportes fechados terminarem antes do fim do laço
+                await asyncio.sleep(0.05)
+
+        return monitor, asyncio.run(executar())
+
+    def situacao(self, monitor):
+        estado = monitor.estado_atual()
+        return dict(zip(estado['Máquina'], estado['Situação']))
+
+    def test_le_corpo_com_tamanho_e_em_partes(self):
+        monitor, respostas = self.coletar({'A': f'{self.base}/m', 'B': f'{self.base}/partes',
+                                           'C': f'{self.base}/sem-tamanho'})
+        self.assertEqual(respostas, [3])
+        estado = monitor.estado_atual()
+        self.assertEqual(list(estado['Estado'].astype('str')), ['Produzindo'] * 3)
+        self.assertEqual(list(estado['Valor']), [10.5] * 3)
+
+    def test_reaproveita_conexao_entre_ciclos(self):
+        _, respostas = self.coletar({'A': f'{self.base}/m'}, ciclos=3)
+        self.assertEqual(respostas, [1, 1, 1])
+        self.assertEqual(len(_Maquinas.conexoes), 1)
+
+    def test_reabre_conexao_fechada_pelo_servidor(self):
+        _, respostas = self.coletar({'A': f'{self.base}/fecha-ociosa'}, ciclos=3)
+        self.assertEqual(respostas, [1, 1, 1])
+        self.assertEqual(len(_Maquinas.conexoes), 3)
+
+    def test_falhas_marcam_so_a_maquina(self):
+        inicio = time.perf_counter()
+        monitor, respostas = self.coletar({'OK': f'{self.base}/m', 'LENTA': f'{self.base}/lenta',
+                                           'ERRO': f'{self.base}/erro', 'FORA': 'http://127.0.0.1:1/'},
+                                          tempo_limite=0.3)
+        self.assertLess(time.perf_counter() - inicio, 1)
+        self.assertEqual(respostas, [1])
+        situacao = self.situacao(monitor)
+        self.assertEqual(situacao['OK'], 'OK')
+        self.assertEqual(situacao['LENTA'], 'Sem resposta (tempo esgotado após 0.3s)')
+        self.assertEqual(situacao['ERRO'], 'Sem resposta (HTTP 500)')
+        self.assertTrue(situacao['FORA'].startswith('Sem resposta'))
+
+    def test_erro_mantem_ultima_leitura_boa(self):
+        monitor, _ = self.coletar({'A': f'{self.base}/m'})
+        self.coletar({'A': f'{self.base}/erro'}, monitor=monitor)
+        estado = monitor.estado_atual()
+        self.assertEqual(estado['Valor'].iloc[0], 10.5)
+        self.assertEqual(estado['Situação'].iloc[0], 'Sem resposta (HTTP 500)')
+
+    def test_thread_coleta_ate_parar(self):
+        monitor = Monitor([])
+        coletor = Coletor({'A': f'{self.base}/m'}, monitor, intervalo=0.05)
+        coletor.start()
+        time.sleep(0.3)
+        coletor.parar()
+        coletor.join(2)
+        self.assertFalse(coletor.is_alive())
+        self.assertGreater(len(monitor.historico('A')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Testes da leitura da planilha do almoxarifado (estoque.py).
+
+Rodar a partir de script/: python -m unittest test_estoque (ou pytest test_estoque.py).
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from openpyxl import Workbook
+
+import estoque
+import ingestao
+
+DIA_1 = datetime(2024, 11, 1)
+DIA_2 = datetime(2024, 11, 2)
+DIA_3 = datetime(2024, 11, 3)
+
+
+def _gravar_almoxarifado(caminho, cabecalho, linhas):
+    """Aba Folha1 no layout do almoxarifado: dias da semana na 1ª linha, cabeçalho na 2ª."""
+    workbook = Workbook()
+    aba = workbook.active
+    aba.title = estoque.ABA_ESTOQUE
+    aba.append([None] * len(cabecalho))
+    aba.append(cabecalho)
+    for linha in linhas:
+        aba.append(linha)
+    workbook.save(caminho)
+
+
+class TestSerieEstoque(unittest.TestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.pasta = pasta.name
+        for modulo, nome in ((estoque, 'SERIE_ESTOQUE_DIR'), (ingestao, 'SNAPSHOTS_DIR')):
+            patcher = mock.patch.object(modulo, nome, os.path.join(self.pasta, nome))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        estoque._estoque_atual.cache_clear()
+        estoque._serie_estoque.cache_clear()
+        self.caminho = os.path.join(self.pasta, 'almoxarifado.xlsx')
+
+    def test_datas_repetidas_seguem_o_ultimo_bloco_preenchido(self):
+        # Segundo bloco com as mesmas datas: o pandas o lê como '2024-11-01 00:00:00.1'
+        fixas = ['Sequência', 'Código', None, 'Produto', 'Família', 'Mínimo', 'Médio', 'Máximo']
+        _gravar_almoxarifado(self.caminho, fixas + [DIA_1, DIA_2, DIA_3, 'Consumido no Mês', DIA_1, DIA_2, DIA_3], [
+            [1, 10, 10, 'PVC A', 'Compostos', 0, 0, 0, 100, 110, 120, 5, 7, 8, None],
+            [2, 20, 20, 'PVC B', 'Compostos', 0, 0, 0, 200, 210, 220, 6, None, 9, None],
+            [3, 30, 30, 'PVC A', 'Compostos', 0, 0, 0, 300, 310, 320, 7, 1, None, None],
+        ])
+
+        dados = ingestao.ler_planilha(self.caminho, estoque.ABA_ESTOQUE, estoque.LINHA_CABECALHO_ESTOQUE)
+        self.assertIn('2024-11-02 00:00:00.1', dados.columns)
+        colunas = estoque.colunas_datas_estoque(dados)
+        self.assertEqual([data for data, _ in colunas], [DIA_1, DIA_2, DIA_3])
+        self.assertEqual([coluna for _, coluna in colunas][1], '2024-11-02 00:00:00.1')
+
+        serie = estoque.carregar_serie_estoque(self.caminho)
+        ultima = serie.index.get_level_values('Data').max()
+        self.assertEqual(ultima, DIA_2)
+        self.assertEqual(serie.loc[ultima, 'kg'].to_dict(), {'PVC A': 8.0, 'PVC B': 9.0})
+
+        # A data mais recente da série é a mesma coluna do estoque atual
+        atual = estoque.carregar_estoque_atual(self.caminho)
+        self.assertEqual(atual.attrs['data_estoque'], DIA_2)
+        self.assertEqual(dict(zip(atual['Produto'], atual['Estoque (kg)'])), {'PVC A': 8.0, 'PVC B': 9.0})
+
+    def test_bloco_repetido_vazio_e_ignorado(self):
+        fixas = ['Sequência', 'Código', None, 'Produto', 'Família', 'Mínimo', 'Médio', 'Máximo']
+        _gravar_almoxarifado(self.caminho, fixas + [DIA_1, DIA_2, 'Consumido no Mês', DIA_1, DIA_2], [
+            [1, 10, 10, 'PVC A', 'Compostos', 0, 0, 0, 100, 110, 5],
+            [2, 20, 20, 'PVC B', 'Compostos', 0, 0, 0, 200, None, 6],
+        ])
+
+        serie = estoque.carregar_serie_estoque(self.caminho)
+        self.assertEqual(sorted(serie.index.get_level_values('Data').unique()), [DIA_1, DIA_2])
+        self.assertEqual(serie.loc[DIA_2, 'kg'].to_dict(), {'PVC A': 110.0})
+
+
+if __name__ == '__main__':
+    unittest.main()